@@ -0,0 +1,270 @@
+"""
+Benchmarks for the degrees search.
+
+Usage: python benchmark.py [directory] [--degrees N] [--queries N]
+       python benchmark.py --frontier
+       python benchmark.py --scaling [--sizes N,N,...] [--compact]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import degrees
+import generate
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
+
+
+def distances_from(source):
+    """
+    Returns a dict mapping every person reachable from source
+    to their degree of separation from source.
+    """
+    distance = {source: 0}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person_id in frontier:
+            for _, star in degrees.neighbors_for_person(person_id):
+                if star not in distance:
+                    distance[star] = distance[person_id] + 1
+                    next_frontier.append(star)
+        frontier = next_frontier
+    return distance
+
+
+def sample_pairs(separation, count, seed=0):
+    """
+    Picks up to `count` (source, target) pairs that are exactly
+    `separation` degrees apart.
+    """
+    rng = random.Random(seed)
+    people = sorted(degrees.people)
+    pairs = []
+    attempts = 0
+    while len(pairs) < count and attempts < 50 * count:
+        attempts += 1
+        source = rng.choice(people)
+        candidates = [
+            person_id for person_id, d in distances_from(source).items()
+            if d == separation
+        ]
+        if candidates:
+            pairs.append((source, rng.choice(candidates)))
+    return pairs
+
+
+def time_search(search, pairs):
+    """
+    Runs search on every pair, returning the
+    list of per-query times and the path lengths found.
+    """
+    times = []
+    lengths = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = search(source, target)
+        times.append(time.perf_counter() - start)
+        lengths.append(None if path is None else len(path))
+    return times, lengths
+
+
+def report(name, times):
+    print(f"{name:>13}: "
+          f"mean {1000 * statistics.mean(times):9.3f} ms  "
+          f"median {1000 * statistics.median(times):9.3f} ms  "
+          f"max {1000 * max(times):9.3f} ms")
+
+
+def percentiles(times):
+    """Returns the 50th, 90th and 99th percentiles of times."""
+    if len(times) < 2:
+        return times * 3
+    cuts = statistics.quantiles(times, n=100, method="inclusive")
+    return cuts[49], cuts[89], cuts[98]
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in bytes,
+    or None where the resource module is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else 1024 * peak
+
+
+def measure(directory, queries, seed=0, compact=False):
+    """
+    Loads directory and times queries between random people in its
+    largest component, returning a dict of the measurements. Meant
+    to run in a fresh process, so that the peak memory is the load's.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=compact, cache=False)
+    load_time = time.perf_counter() - start
+    memory = peak_memory()
+
+    # The largest component is labelled 0
+    rng = random.Random(seed)
+    people = list(degrees.people)
+    pairs = []
+    while len(pairs) < queries:
+        source, target = rng.choice(people), rng.choice(people)
+        if degrees.components[source] == degrees.components[target] == 0:
+            pairs.append((source, target))
+
+    times, lengths = time_search(degrees.shortest_path, pairs)
+    p50, p90, p99 = percentiles(times)
+    return {
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "load_s": round(load_time, 3),
+        "memory_mb": None if memory is None else round(memory / 2 ** 20, 1),
+        "p50_ms": round(1000 * p50, 3),
+        "p90_ms": round(1000 * p90, 3),
+        "p99_ms": round(1000 * p99, 3),
+        "max_ms": round(1000 * max(times), 3),
+        "mean_degrees": round(statistics.mean(lengths), 2)
+    }
+
+
+def scaling_benchmark(sizes, data, queries, seed=0, compact=False):
+    """
+    Generates a synthetic data set of each size (number of stars)
+    under data, reusing any already there, and measures each one
+    in its own subprocess.
+    """
+    print(f"{'stars':>10} {'people':>9} {'movies':>9} {'load s':>8} "
+          f"{'MB':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8}")
+    for size in sizes:
+        directory = os.path.join(data, f"stars-{size}-{seed}")
+        if not os.path.exists(os.path.join(directory, "stars.csv")):
+            generate.generate(directory, size, seed)
+        command = [sys.executable, os.path.abspath(__file__), directory,
+                   "--measure", "--queries", str(queries),
+                   "--seed", str(seed)]
+        if compact:
+            command.append("--compact")
+        output = subprocess.run(command, check=True, capture_output=True,
+                                text=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        memory = result["memory_mb"]
+        print(f"{size:>10} {result['people']:>9} {result['movies']:>9} "
+              f"{result['load_s']:>8.2f} "
+              f"{'n/a' if memory is None else f'{memory:.0f}':>7} "
+              f"{result['p50_ms']:>8.2f} {result['p90_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {result['max_ms']:>8.2f}",
+              flush=True)
+
+
+def frontier_benchmark(sizes=(1_000, 10_000, 100_000)):
+    """
+    Times add, contains_state and remove on each frontier at several
+    sizes. Constant-time operations show the same cost per operation
+    at every size.
+    """
+    print(f"{'frontier':>16} {'size':>8} "
+          f"{'add':>8} {'contains':>9} {'remove':>8}  (ns per op)")
+    for frontier_class in (StackFrontier, QueueFrontier, PriorityFrontier):
+        for size in sizes:
+            nodes = [Node(i, None, None) for i in range(size)]
+            rng = random.Random(size)
+            probes = [rng.randrange(2 * size) for _ in range(size)]
+            frontier = frontier_class()
+
+            start = time.perf_counter()
+            for node in nodes:
+                frontier.add(node)
+            added = time.perf_counter()
+            for state in probes:
+                frontier.contains_state(state)
+            checked = time.perf_counter()
+            while not frontier.empty():
+                frontier.remove()
+            removed = time.perf_counter()
+
+            print(f"{frontier_class.__name__:>16} {size:>8} "
+                  f"{1e9 * (added - start) / size:>8.0f} "
+                  f"{1e9 * (checked - added) / size:>9.0f} "
+                  f"{1e9 * (removed - checked) / size:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--degrees", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frontier", action="store_true",
+                        help="benchmark the util.py frontiers instead")
+    parser.add_argument("--scaling", action="store_true",
+                        help="benchmark load time, memory and latency "
+                             "over synthetic data sets of several sizes")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="comma-separated numbers of stars to scale "
+                             "over (up to 10000000)")
+    parser.add_argument("--data", default=None,
+                        help="directory to keep the synthetic data sets "
+                             "in (default: a temporary directory)")
+    parser.add_argument("--compact", action="store_true",
+                        help="load the compact graph for --scaling")
+    parser.add_argument("--measure", action="store_true",
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.frontier:
+        frontier_benchmark()
+        return
+
+    if args.measure:
+        print(json.dumps(measure(args.directory, args.queries, args.seed,
+                                 args.compact)))
+        return
+
+    if args.scaling:
+        sizes = [int(size) for size in args.sizes.split(",")]
+        if args.data:
+            scaling_benchmark(sizes, args.data, args.queries, args.seed,
+                              args.compact)
+        else:
+            with tempfile.TemporaryDirectory() as data:
+                scaling_benchmark(sizes, data, args.queries, args.seed,
+                                  args.compact)
+        return
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    pairs = sample_pairs(args.degrees, args.queries, args.seed)
+    if not pairs:
+        raise SystemExit(f"No pairs {args.degrees} degrees apart found.")
+    print(f"{len(pairs)} queries at {args.degrees} degrees of separation")
+
+    one_sided, one_sided_lengths = time_search(
+        degrees.one_sided_shortest_path, pairs
+    )
+    bidirectional, lengths = time_search(degrees.shortest_path, pairs)
+    if lengths != one_sided_lengths:
+        raise SystemExit("Searches disagree on path lengths.")
+
+    report("one-sided", one_sided)
+    report("bidirectional", bidirectional)
+    speedup = sum(one_sided) / sum(bidirectional)
+    print(f"Speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
+import argparse
 import csv
+import gc
+import json
+import multiprocessing
+import os
 import sys
+import time
+from itertools import islice
 
-from util import Node, StackFrontier, QueueFrontier
+import landmarks
+import paths
+import server
+from graph import Graph, People, Movies, Names, Components, renumber_by_size
+from nameindex import NameIndex
+from util import Node, StackFrontier, QueueFrontier, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +24,79 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps person_ids to the label of their connected component (0 is the largest)
+components = {}
 
-def load_data(directory):
+# Number of people in each component, indexed by label
+component_sizes = []
+
+# Compact Graph backing the dicts above, when loaded with compact=True
+graph = None
+
+# Landmark distances over the compact Graph, when loaded with landmarks > 0
+landmark_index = None
+
+# Prefix and fuzzy lookup over the keys of `names`, built on first use
+# when the data isn't compact
+name_index = None
+
+# File in the data directory that caches the compact Graph
+SNAPSHOT = "degrees.snapshot"
+
+
+def load_data(directory, compact=False, cache=True, landmark_count=0):
     """
     Load data from CSV files into memory.
+
+    With compact=True the data is held in an integer-indexed CSR Graph
+    instead, and `names`, `people` and `movies` become read-only views
+    over it. Unless cache=False, the Graph is memory-mapped from a
+    snapshot in the directory when one is up to date with the CSV
+    files, and a fresh snapshot is written otherwise.
+
+    With landmark_count > 0 (compact only), distances from that many
+    landmark people are also loaded, or computed and saved, and
+    shortest_path uses them to bound its search.
     """
+    global names, people, movies, components, component_sizes, graph
+    global landmark_index, name_index
+    if landmark_count and not compact:
+        raise ValueError("landmarks require the compact graph")
+
+    # Forget whatever an earlier call loaded
+    names = {}
+    people = {}
+    movies = {}
+    components = {}
+    component_sizes = []
+    graph = None
+    landmark_index = None
+    name_index = None
+
+    if compact:
+        path = os.path.join(directory, SNAPSHOT)
+        sources = [os.path.join(directory, f"{name}.csv")
+                   for name in ("people", "movies", "stars")]
+        graph = Graph.load(path, sources) if cache else None
+        if graph is None:
+            graph = Graph.from_csv(directory)
+            if cache:
+                try:
+                    graph.save(path, sources)
+                except OSError:
+                    pass
+        names = Names(graph)
+        people = People(graph)
+        movies = Movies(graph)
+        components = Components(graph)
+        component_sizes = graph.component_sizes
+        name_index = graph.name_index
+        if landmark_count:
+            landmark_index = landmarks.load_or_build(
+                graph, landmark_count, directory, sources
+            )
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,16 +131,124 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    label_components()
+
+
+def label_components():
+    """
+    Sets `components` and `component_sizes` by
+    walking every connected component of `people`.
+    """
+    global components, component_sizes
+    labels = {}
+    sizes = []
+    seen_movies = set()
+    for start in people:
+        if start in labels:
+            continue
+        label = len(sizes)
+        labels[start] = label
+        stack = [start]
+        size = 0
+        while stack:
+            person_id = stack.pop()
+            size += 1
+            for movie_id in people[person_id]["movies"]:
+                if movie_id in seen_movies:
+                    continue
+                seen_movies.add(movie_id)
+                for star in movies[movie_id]["stars"]:
+                    if star not in labels:
+                        labels[star] = label
+                        stack.append(star)
+        sizes.append(size)
+
+    rank, sizes = renumber_by_size(sizes)
+    components = {person_id: rank[label]
+                  for person_id, label in labels.items()}
+    component_sizes = list(sizes)
+
+
+def component_stats():
+    """
+    Returns summary statistics about the connected components.
+    """
+    people_count = sum(component_sizes)
+    histogram = {}
+    for size in component_sizes:
+        histogram[size] = histogram.get(size, 0) + 1
+    return {
+        "components": len(component_sizes),
+        "people": people_count,
+        "largest": component_sizes[0] if len(component_sizes) else 0,
+        "largest_share": (component_sizes[0] / people_count
+                          if people_count else 0.0),
+        "isolated": histogram.get(1, 0),
+        "sizes": dict(sorted(histogram.items(), reverse=True))
+    }
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        usage="python degrees.py [--compact [--no-cache] [--landmarks K]] "
+              "[--batch FILE [--workers N] | --serve [HOST:]PORT] "
+              "[directory]"
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="hold the graph in compact CSR arrays")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="do not read or write the compact snapshot")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated source/target pairs "
+                             "from FILE ('-' for stdin) as JSON lines")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes for --batch")
+    parser.add_argument("--components", action="store_true",
+                        help="print connected component statistics")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="bound searches with K landmark distances")
+    parser.add_argument("--serve", metavar="[HOST:]PORT",
+                        help="keep the graph loaded and answer HTTP queries")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="results the server keeps in its LRU cache")
+    parser.add_argument("--all", type=int, nargs="?", const=0, metavar="K",
+                        help="print every shortest path, or the first K")
+    parser.add_argument("--stats", action="store_true",
+                        help="print search statistics after the path")
+    args = parser.parse_args()
+    if args.landmarks and not args.compact:
+        parser.error("--landmarks requires --compact")
+
+    # Load data from files into memory (reporting on stderr in batch mode,
+    # where stdout carries the results)
+    log = sys.stderr if args.batch else sys.stdout
+    print("Loading data...", file=log)
+    load_data(args.directory, compact=args.compact, cache=args.cache,
+              landmark_count=args.landmarks)
+    print("Data loaded.", file=log)
 
-    # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    if args.components:
+        stats = component_stats()
+        print(f"{stats['components']} components over "
+              f"{stats['people']} people; the largest has "
+              f"{stats['largest']} ({100 * stats['largest_share']:.1f}%), "
+              f"{stats['isolated']} people are isolated.", file=log)
+
+    if args.batch:
+        if args.batch == "-":
+            f = sys.stdin
+        else:
+            f = open(args.batch, encoding="utf-8")
+        with f:
+            for answer in batch_queries(read_pairs(f), args.workers):
+                print(json.dumps(answer), flush=True)
+        return
+
+    if args.serve:
+        server.serve(server.parse_address(args.serve), resolve_person,
+                     shortest_path, suggestions, args.cache_size)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,31 +257,196 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.all is not None:
+        count = 0
+        for count, path in enumerate(
+            all_shortest_paths(source, target, args.all or None), 1
+        ):
+            if count == 1:
+                print(f"{len(path)} degrees of separation.")
+            print(f"Path {count}:")
+            print_path(source, path)
+        if not count:
+            print("Not connected.")
+        return
+
+    if args.stats:
+        path, stats = shortest_path_with_stats(source, target)
+    else:
+        path = shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print(f"{len(path)} degrees of separation.")
+        print_path(source, path)
+    if args.stats:
+        print(f"Search: {stats}")
 
 
-def shortest_path(source, target):
+def print_path(source, path):
+    """
+    Prints each step of a path of (movie_id, person_id) pairs.
+    """
+    degrees = len(path)
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    If no possible path, returns None. If a SearchStats is given,
+    the search's counters are added to it.
+
+    Searches from both ends at once, always growing whichever
+    frontier is smaller, and stops as soon as the two meet.
+    People in different components are rejected without searching.
+    """
+    if landmark_index is not None:
+        return landmark_index.shortest_path(source, target, stats=stats)
+    if graph is not None:
+        return graph.shortest_path(source, target, stats=stats)
+    if source == target:
+        return []
+    if components[source] != components[target]:
+        return None
+
+    # Maps each visited person to the (movie_id, person_id) edge that
+    # leads back towards the root of that side, or None for the root
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if stats is not None:
+            stats.peak_frontier = max(
+                stats.peak_frontier,
+                len(forward_frontier) + len(backward_frontier)
+            )
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meet = expand_layer(
+                forward_frontier, forward, backward, stats
+            )
+        else:
+            backward_frontier, meet = expand_layer(
+                backward_frontier, backward, forward, stats
+            )
+        if meet is not None:
+            return join_paths(meet, forward, backward)
+    return None
+
+
+def shortest_path_with_stats(source, target):
+    """
+    Returns the shortest path as shortest_path does,
+    together with a SearchStats describing the search.
+    """
+    stats = SearchStats()
+    start = time.perf_counter()
+    path = shortest_path(source, target, stats)
+    stats.total_time = time.perf_counter() - start
+    return path, stats
+
+
+def all_shortest_paths(source, target, k=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, or only the first k of them.
+
+    Paths are produced lazily from a DAG of shortest-path edges, so
+    memory stays bounded by the DAG however many paths there are.
+    """
+    if graph is not None:
+        found = graph.all_shortest_paths(source, target)
+    elif components[source] != components[target]:
+        return
+    else:
+        found = paths.all_shortest_paths(source, target, neighbors_for_person)
+    yield from islice(found, k)
+
+
+def expand_layer(frontier, visited, other, stats=None):
+    """
+    Expands every person in the frontier by one hop.
+
+    Returns the next frontier and the first person reached that the
+    other side has already visited (or None if the sides did not meet).
+    Every meeting found in a single layer gives a path of the same
+    length, so stopping at the first one is still optimal.
     """
+    if stats is not None:
+        return expand_layer_instrumented(frontier, visited, other, stats)
+    next_frontier = []
+    for person_id in frontier:
+        for movie_id, star in neighbors_for_person(person_id):
+            if star in visited:
+                continue
+            visited[star] = (movie_id, person_id)
+            if star in other:
+                return next_frontier, star
+            next_frontier.append(star)
+    return next_frontier, None
 
-    # TODO
-    #raise NotImplementedError 
+
+def expand_layer_instrumented(frontier, visited, other, stats):
+    """
+    expand_layer, also recording its work in stats. Kept separate
+    so that searches without stats pay nothing for the timing.
+    """
+    clock = time.perf_counter
+    stats.layers += 1
+    next_frontier = []
+    for person_id in frontier:
+        start = clock()
+        neighbors = neighbors_for_person(person_id)
+        stats.neighbor_time += clock() - start
+        stats.expanded += 1
+        stats.edges += len(neighbors)
+        for movie_id, star in neighbors:
+            if star in visited:
+                continue
+            visited[star] = (movie_id, person_id)
+            if star in other:
+                return next_frontier, star
+            next_frontier.append(star)
+    return next_frontier, None
+
+
+def join_paths(meet, forward, backward):
+    """
+    Joins the two half paths that meet at `meet` into
+    a list of (movie_id, person_id) pairs from source to target.
+    """
+    path = []
+    person_id = meet
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meet
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def one_sided_shortest_path(source, target):
+    """
+    Breadth-first search outward from the source only.
+
+    Kept as the reference implementation that `shortest_path`
+    is benchmarked against (see benchmark.py).
+    """
     path = []
     if source == target:
         return path
@@ -107,17 +460,14 @@ def shortest_path(source, target):
     q.add(n)
     state = False
     vis[source]=True
-    # print(source,target)
     while not q.empty():
         node = q.remove()
-        # print(node.action)
         l1 = neighbors_for_person(node.action)
         for movie,star in l1:
             if star == target:
                 path.append((movie,star))
                 relate_star = node.action
                 state = True
-                # print("yulu",relate_star)
                 break
             elif not vis[star]:
                 l[star] = (movie,node.action)
@@ -132,7 +482,6 @@ def shortest_path(source, target):
         rel = l[relate_star]
         path.append((rel[0],relate_star))
         relate_star = rel[1]
-    # print(path)
     path.reverse()
     return path
 
@@ -140,26 +489,137 @@ def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If no one has exactly that name, offers the closest matches.
     """
     person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
-        return None
+    if len(person_ids) == 1:
+        return person_ids[0]
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
+        candidates = [describe_person(person_id) for person_id in person_ids]
     else:
-        return person_ids[0]
+        candidates = suggestions(name)
+        if not candidates:
+            return None
+        print(f"No one named '{name}'. Did you mean:")
+    for person in candidates:
+        print(f"ID: {person['person_id']}, Name: {person['name']}, "
+              f"Birth: {person['birth']}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in [person["person_id"] for person in candidates]:
+            return person_id
+    except ValueError:
+        pass
+    return None
+
+
+def describe_person(person_id):
+    """Returns a person's ID, name and birth year as a dict."""
+    person = people[person_id]
+    return {
+        "person_id": person_id,
+        "name": person["name"],
+        "birth": person["birth"]
+    }
+
+
+def suggestions(text, limit=10):
+    """
+    Returns up to limit people whose names best match text, ranked
+    exact match first, then by prefix, then by trigram similarity.
+    """
+    global name_index
+    if name_index is None:
+        # Only needed once a name has no exact match
+        name_index = NameIndex.build(sorted(names))
+
+    matches = []
+    for key in name_index.suggest(text, limit):
+        for person_id in sorted(names[key]):
+            matches.append(describe_person(person_id))
+    return matches[:limit]
+
+
+def resolve_person(text):
+    """
+    Returns the person_id for text, which may be either an ID or
+    a name, without prompting.
+
+    Raises LookupError if no one or more than one person matches.
+    """
+    if text in people:
+        return text
+    person_ids = names.get(text.lower(), set())
+    if len(person_ids) == 0:
+        close = [person["name"] for person in suggestions(text, 3)]
+        hint = f" (did you mean {', '.join(close)}?)" if close else ""
+        raise LookupError(f"Person not found: {text}{hint}")
+    if len(person_ids) > 1:
+        raise LookupError(
+            f"Ambiguous name: {text} (IDs {', '.join(sorted(person_ids))})"
+        )
+    return next(iter(person_ids))
+
+
+def read_pairs(f):
+    """
+    Yields (source, target) pairs from the lines of f, one
+    tab-separated pair per line, skipping blank lines.
+    """
+    for line in f:
+        line = line.strip()
+        if line:
+            source, _, target = line.partition("\t")
+            yield source.strip(), target.strip()
+
+
+def answer_query(pair):
+    """
+    Answers a single batch query, returning a JSON-serializable dict.
+    """
+    source, target = pair
+    answer = {"source": source, "target": target}
+    try:
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+    except LookupError as e:
+        answer["error"] = e.args[0]
+        return answer
+
+    path = shortest_path(source_id, target_id)
+    answer["degrees"] = None if path is None else len(path)
+    answer["path"] = None if path is None else [
+        {"movie_id": movie_id, "person_id": person_id}
+        for movie_id, person_id in path
+    ]
+    return answer
+
+
+def batch_queries(pairs, workers=1):
+    """
+    Answers an iterable of (source, target) pairs, yielding the
+    answers in input order as they become available.
+
+    With more than one worker the queries are spread over a pool of
+    forked processes. They inherit the already loaded graph, and with
+    a compact snapshot the mapped pages are shared between all of them
+    rather than copied, so nothing is reloaded per worker.
+    """
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        yield from map(answer_query, pairs)
+        return
+
+    # Keep the garbage collector from touching (and so copying)
+    # every inherited object in each child
+    gc.freeze()
+    try:
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers) as pool:
+            yield from pool.imap(answer_query, pairs, chunksize=64)
+    finally:
+        gc.unfreeze()
 
 
 def neighbors_for_person(person_id):
@@ -0,0 +1,122 @@
+"""
+Synthetic movie data for testing degrees at scale.
+
+Writes people.csv, movies.csv and stars.csv in the same format as the
+small and large directories. Cast sizes follow a power law, so most
+movies have a handful of stars and a few have hundreds, and casting
+favours a minority of prolific people, as in the real data.
+
+Usage: python generate.py directory --stars N [--seed S]
+"""
+
+import argparse
+import csv
+import os
+import random
+
+# Tail exponent of the cast size distribution; lower means heavier
+CAST_ALPHA = 1.6
+MAX_CAST = 500
+
+# Average number of movies per person, and how strongly casting
+# favours the people with low indices (1 is uniform)
+ROLES_PER_PERSON = 3
+POPULARITY_SKEW = 2
+
+FIRST_NAMES = [
+    "Ada", "Alan", "Anna", "Ben", "Carla", "Chris", "Dana", "David",
+    "Elena", "Emma", "Frank", "Grace", "Hugo", "Ines", "Ivan", "Jack",
+    "Julia", "Kate", "Leo", "Lucy", "Maria", "Mark", "Nina", "Omar",
+    "Paul", "Rosa", "Sam", "Sara", "Tom", "Vera", "Will", "Zoe"
+]
+LAST_NAMES = [
+    "Adams", "Baker", "Bacon", "Brown", "Clark", "Cruz", "Davis", "Evans",
+    "Ford", "Garcia", "Green", "Hall", "Hanks", "Hill", "Jones", "King",
+    "Lee", "Lopez", "Moore", "Nguyen", "Park", "Reed", "Ross", "Scott",
+    "Smith", "Stone", "Taylor", "Turner", "Walker", "White", "Young", "Zhou"
+]
+
+# Share of people given the same name as someone before them,
+# so that name lookups have ambiguous names to deal with
+DUPLICATE_NAMES = 0.01
+
+
+def cast_size(rng):
+    """Draws a power-law distributed cast size."""
+    return min(int(rng.paretovariate(CAST_ALPHA)), MAX_CAST)
+
+
+def person_name(i):
+    """Returns a distinct name for the i-th person."""
+    first = FIRST_NAMES[i % len(FIRST_NAMES)]
+    i //= len(FIRST_NAMES)
+    last = LAST_NAMES[i % len(LAST_NAMES)]
+    i //= len(LAST_NAMES)
+    return f"{first} {last}" if not i else f"{first} {last} {i + 1}"
+
+
+def generate(directory, stars, seed=0):
+    """
+    Writes a synthetic data set with about `stars` rows in stars.csv
+    to directory, returning the (people, movies, stars) counts written.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    people_count = max(stars // ROLES_PER_PERSON, 2)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(people_count):
+            if i and rng.random() < DUPLICATE_NAMES:
+                name = person_name(rng.randrange(i))
+            else:
+                name = person_name(i)
+            birth = rng.randint(1900, 2010) if rng.random() < 0.8 else ""
+            writer.writerow([i + 1, name, birth])
+
+    movies_count = 0
+    rows = 0
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as movies_file, \
+            open(os.path.join(directory, "stars.csv"), "w",
+                 encoding="utf-8", newline="") as stars_file:
+        movies_writer = csv.writer(movies_file)
+        stars_writer = csv.writer(stars_file)
+        movies_writer.writerow(["id", "title", "year"])
+        stars_writer.writerow(["person_id", "movie_id"])
+        while rows < stars:
+            movies_count += 1
+            movie_id = movies_count
+            movies_writer.writerow([movie_id, f"Movie {movie_id}",
+                                    rng.randint(1920, 2020)])
+            cast = {
+                int(people_count * rng.random() ** POPULARITY_SKEW) + 1
+                for _ in range(min(cast_size(rng), stars - rows))
+            }
+            stars_writer.writerows(
+                (person_id, movie_id) for person_id in cast
+            )
+            rows += len(cast)
+
+    return people_count, movies_count, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("directory")
+    parser.add_argument("--stars", type=int, default=100_000,
+                        help="rows to write to stars.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    people_count, movies_count, rows = generate(
+        args.directory, args.stars, args.seed
+    )
+    print(f"Wrote {people_count} people, {movies_count} movies "
+          f"and {rows} stars to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
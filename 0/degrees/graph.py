@@ -0,0 +1,544 @@
+"""
+Compact, integer-indexed representation of the movie graph.
+
+People and movies are numbered densely by the sorted order of their
+IDs, so an ID can be turned back into its index with a binary search
+instead of a dict. Person->movie and movie->person adjacency is stored
+in CSR form: the movies of person `p` are
+`person_movies[person_offsets[p]:person_offsets[p + 1]]`, and likewise
+for the stars of a movie.
+"""
+
+import csv
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+import paths
+import snapshot
+from nameindex import NameIndex
+
+
+def index_of(ids, key):
+    """
+    Returns the position of key in the sorted sequence ids,
+    or None if it is not there.
+    """
+    i = bisect_left(ids, key)
+    if i < len(ids) and ids[i] == key:
+        return i
+    return None
+
+
+def csr(rows, cols, size):
+    """
+    Builds CSR (offsets, indices) arrays from parallel row/column
+    arrays, with each row's indices sorted and de-duplicated.
+    """
+    buckets = [[] for _ in range(size)]
+    for row, col in zip(rows, cols):
+        buckets[row].append(col)
+
+    offsets = array("i", [0])
+    indices = array("i")
+    for bucket in buckets:
+        indices.extend(sorted(set(bucket)))
+        offsets.append(len(indices))
+    return offsets, indices
+
+
+def renumber_by_size(sizes):
+    """
+    Given the size of each component, returns (rank, sizes) where
+    rank maps each old label to a new one numbered from the largest
+    component to the smallest, and sizes is reordered to match.
+    """
+    order = sorted(range(len(sizes)), key=lambda label: -sizes[label])
+    rank = array("i", [0]) * len(sizes)
+    for new, old in enumerate(order):
+        rank[old] = new
+    return rank, array("i", (sizes[label] for label in order))
+
+
+def label_components(person_offsets, person_movies, movie_offsets,
+                     movie_people):
+    """
+    Labels every person with the connected component they belong to.
+
+    Returns (labels, sizes) arrays, where labels[person] is the
+    component of a person and sizes[label] its number of people.
+    Label 0 is the largest component.
+    """
+    labels = array("i", [-1]) * (len(person_offsets) - 1)
+    seen_movies = bytearray(len(movie_offsets) - 1)
+    sizes = []
+    for start in range(len(labels)):
+        if labels[start] != -1:
+            continue
+        label = len(sizes)
+        labels[start] = label
+        stack = [start]
+        size = 0
+        while stack:
+            person = stack.pop()
+            size += 1
+            for movie in person_movies[
+                person_offsets[person]:person_offsets[person + 1]
+            ]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in movie_people[
+                    movie_offsets[movie]:movie_offsets[movie + 1]
+                ]:
+                    if labels[star] == -1:
+                        labels[star] = label
+                        stack.append(star)
+        sizes.append(size)
+
+    rank, sizes = renumber_by_size(sizes)
+    for person, label in enumerate(labels):
+        labels[person] = rank[label]
+    return labels, sizes
+
+
+class Graph():
+    """
+    The movie graph as flat arrays.
+
+    All arrays are exposed as memoryviews so that slicing one to
+    walk an adjacency list never copies it.
+    """
+
+    # Everything that is written to and mapped back from a snapshot
+    SECTIONS = (
+        "person_ids", "person_names", "person_births",
+        "movie_ids", "movie_titles", "movie_years",
+        "person_offsets", "person_movies", "movie_offsets", "movie_people",
+        "name_keys", "name_people",
+        "component", "component_sizes",
+        "trigram_keys", "trigram_offsets", "trigram_postings"
+    )
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 name_keys, name_people, component, component_sizes,
+                 trigram_keys, trigram_offsets, trigram_postings):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = memoryview(person_offsets)
+        self.person_movies = memoryview(person_movies)
+        self.movie_offsets = memoryview(movie_offsets)
+        self.movie_people = memoryview(movie_people)
+
+        # Lowercased names, sorted, with the person each one belongs to
+        self.name_keys = name_keys
+        self.name_people = memoryview(name_people)
+
+        # Connected component label of each person, and size of each
+        # component, largest first
+        self.component = memoryview(component)
+        self.component_sizes = memoryview(component_sizes)
+
+        # Prefix and fuzzy lookup over name_keys
+        self.trigram_keys = trigram_keys
+        self.trigram_offsets = trigram_offsets
+        self.trigram_postings = trigram_postings
+        self.name_index = NameIndex(
+            name_keys, trigram_keys, trigram_offsets, trigram_postings
+        )
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Loads the graph from people.csv, movies.csv and stars.csv.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            rows = sorted(
+                (row["id"], row["name"], row["birth"])
+                for row in csv.DictReader(f)
+            )
+        person_ids = [row[0] for row in rows]
+        person_names = [row[1] for row in rows]
+        person_births = [row[2] for row in rows]
+
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            rows = sorted(
+                (row["id"], row["title"], row["year"])
+                for row in csv.DictReader(f)
+            )
+        movie_ids = [row[0] for row in rows]
+        movie_titles = [row[1] for row in rows]
+        movie_years = [row[2] for row in rows]
+        del rows
+
+        # Translate stars into index pairs, skipping unknown IDs
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        star_people = array("i")
+        star_movies = array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person = person_index.get(row["person_id"])
+                movie = movie_index.get(row["movie_id"])
+                if person is not None and movie is not None:
+                    star_people.append(person)
+                    star_movies.append(movie)
+        del person_index, movie_index
+
+        person_offsets, person_movies = csr(
+            star_people, star_movies, len(person_ids)
+        )
+        movie_offsets, movie_people = csr(
+            star_movies, star_people, len(movie_ids)
+        )
+
+        order = sorted(
+            range(len(person_names)), key=lambda i: person_names[i].lower()
+        )
+        name_keys = [person_names[i].lower() for i in order]
+        name_people = array("i", order)
+
+        component, component_sizes = label_components(
+            person_offsets, person_movies, movie_offsets, movie_people
+        )
+        name_index = NameIndex.build(name_keys)
+
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_people,
+                   name_keys, name_people, component, component_sizes,
+                   name_index.trigram_keys, name_index.trigram_offsets,
+                   name_index.trigram_postings)
+
+    @classmethod
+    def load(cls, path, sources):
+        """
+        Memory-maps the graph from the snapshot at path.
+
+        Returns None if the snapshot is missing, unreadable or older
+        than any of the source files.
+        """
+        sections = snapshot.read(path, sources)
+        if sections is None or not all(name in sections
+                                       for name in cls.SECTIONS):
+            return None
+        return cls(*(sections[name] for name in cls.SECTIONS))
+
+    def save(self, path, sources):
+        """
+        Writes the graph to a snapshot at path, stamped with the
+        size and modification time of the source files.
+        """
+        snapshot.write(
+            path, {name: getattr(self, name) for name in self.SECTIONS},
+            sources
+        )
+
+    def person_index(self, person_id):
+        """Returns the dense index of a person ID, or None."""
+        return index_of(self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """Returns the dense index of a movie ID, or None."""
+        return index_of(self.movie_ids, movie_id)
+
+    def movies_of(self, person):
+        """Returns the movie indices a person starred in."""
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_of(self, movie):
+        """Returns the person indices who starred in a movie."""
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for everyone
+        who starred with a person, including themselves.
+        """
+        for movie in self.movies_of(person):
+            for star in self.stars_of(movie):
+                yield movie, star
+
+    def people_named(self, name):
+        """Returns the person indices whose lowercased name is name."""
+        lo = bisect_left(self.name_keys, name)
+        hi = bisect_right(self.name_keys, name, lo)
+        return self.name_people[lo:hi]
+
+    def shortest_path(self, source_id, target_id, max_degrees=None,
+                      stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, or None.
+        If max_degrees is given, paths any longer are not looked for.
+        If a SearchStats is given, the search's counters are added to it.
+
+        Bidirectional breadth-first search over the CSR arrays,
+        always expanding the smaller frontier. People in different
+        components are rejected up front without searching.
+        """
+        source = self.person_index(source_id)
+        target = self.person_index(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return []
+        if self.component[source] != self.component[target]:
+            return None
+
+        forward = {source: None}
+        backward = {target: None}
+        forward_movies = set()
+        backward_movies = set()
+        forward_frontier = [source]
+        backward_frontier = [target]
+
+        # Every layer expanded adds one degree to the paths found
+        degrees = 0
+        while forward_frontier and backward_frontier:
+            degrees += 1
+            if max_degrees is not None and degrees > max_degrees:
+                return None
+            if stats is not None:
+                stats.peak_frontier = max(
+                    stats.peak_frontier,
+                    len(forward_frontier) + len(backward_frontier)
+                )
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meet = self.expand_layer(
+                    forward_frontier, forward, forward_movies, backward, stats
+                )
+            else:
+                backward_frontier, meet = self.expand_layer(
+                    backward_frontier, backward, backward_movies, forward,
+                    stats
+                )
+            if meet is not None:
+                return self.join_paths(meet, forward, backward)
+        return None
+
+    def all_shortest_paths(self, source_id, target_id):
+        """
+        Yields every shortest list of (movie_id, person_id) pairs
+        that connects the source to the target, one at a time.
+        """
+        source = self.person_index(source_id)
+        target = self.person_index(target_id)
+        if source is None or target is None:
+            return
+        if self.component[source] != self.component[target]:
+            return
+        for path in paths.all_shortest_paths(source, target, self.neighbors):
+            yield [(self.movie_ids[movie], self.person_ids[person])
+                   for movie, person in path]
+
+    def expand_layer(self, frontier, visited, seen_movies, other,
+                     stats=None):
+        """
+        Expands every person in the frontier by one hop.
+
+        Returns the next frontier and the first person reached that
+        the other side has already visited, or None. A movie whose
+        cast has already been scanned from this side is skipped,
+        since every one of its stars is visited already.
+        """
+        if stats is not None:
+            return self.expand_layer_instrumented(
+                frontier, visited, seen_movies, other, stats
+            )
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[
+                person_offsets[person]:person_offsets[person + 1]
+            ]:
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                for star in movie_people[
+                    movie_offsets[movie]:movie_offsets[movie + 1]
+                ]:
+                    if star in visited:
+                        continue
+                    visited[star] = (movie, person)
+                    if star in other:
+                        return next_frontier, star
+                    next_frontier.append(star)
+        return next_frontier, None
+
+    def expand_layer_instrumented(self, frontier, visited, seen_movies,
+                                  other, stats):
+        """
+        expand_layer, also recording its work in stats. Each person's
+        co-stars are gathered into a list first so that finding them
+        can be timed apart from the bookkeeping. Kept separate so that
+        searches without stats pay nothing for the timing.
+        """
+        clock = time.perf_counter
+        stats.layers += 1
+        next_frontier = []
+        for person in frontier:
+            start = clock()
+            neighbors = []
+            for movie in self.movies_of(person):
+                if movie not in seen_movies:
+                    seen_movies.add(movie)
+                    neighbors.extend(
+                        (movie, star) for star in self.stars_of(movie)
+                    )
+            stats.neighbor_time += clock() - start
+            stats.expanded += 1
+            stats.edges += len(neighbors)
+            for movie, star in neighbors:
+                if star in visited:
+                    continue
+                visited[star] = (movie, person)
+                if star in other:
+                    return next_frontier, star
+                next_frontier.append(star)
+        return next_frontier, None
+
+    def join_paths(self, meet, forward, backward):
+        """
+        Joins the two half paths that meet at `meet` into a list of
+        (movie_id, person_id) pairs from source to target.
+        """
+        path = []
+        person = meet
+        while forward[person] is not None:
+            movie, parent = forward[person]
+            path.append((self.movie_ids[movie], self.person_ids[person]))
+            person = parent
+        path.reverse()
+
+        person = meet
+        while backward[person] is not None:
+            movie, person = backward[person]
+            path.append((self.movie_ids[movie], self.person_ids[person]))
+        return path
+
+
+class People(Mapping):
+    """
+    Read-only view of a Graph shaped like the `people` dict:
+    person_id -> {"name", "birth", "movies"}.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie]
+                       for movie in graph.movies_of(person)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+    def __contains__(self, person_id):
+        return self.graph.person_index(person_id) is not None
+
+
+class Movies(Mapping):
+    """
+    Read-only view of a Graph shaped like the `movies` dict:
+    movie_id -> {"title", "year", "stars"}.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.movie_index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person]
+                      for person in graph.stars_of(movie)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+    def __contains__(self, movie_id):
+        return self.graph.movie_index(movie_id) is not None
+
+
+class Components(Mapping):
+    """
+    Read-only view of a Graph shaped like the `components` dict:
+    person_id -> component label.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        person = self.graph.person_index(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return self.graph.component[person]
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class Names(Mapping):
+    """
+    Read-only view of a Graph shaped like the `names` dict:
+    lowercased name -> set of person_ids.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        people = graph.people_named(name)
+        if not len(people):
+            raise KeyError(name)
+        return {graph.person_ids[person] for person in people}
+
+    def __iter__(self):
+        previous = None
+        for key in self.graph.name_keys:
+            if key != previous:
+                yield key
+                previous = key
+
+    def __len__(self):
+        return sum(1 for _ in self)
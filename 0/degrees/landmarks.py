@@ -0,0 +1,265 @@
+"""
+Landmark distance index for repeated shortest path queries.
+
+A handful of well-connected people are picked as landmarks and the
+degree of separation from each of them to everyone else is stored.
+By the triangle inequality, for any landmark L
+
+    |d(L, s) - d(L, t)|  <=  d(s, t)  <=  d(s, L) + d(L, t)
+
+so every query starts with a lower bound and a concrete path (the
+detour through the best landmark) to beat.
+"""
+
+import multiprocessing
+import os
+from array import array
+
+import snapshot
+
+# Distance stored for people a landmark cannot reach (distances are
+# capped one below it). Two people in the same component are reached
+# by the same landmarks, so this never affects their lower bound.
+UNREACHABLE = 255
+
+# Graph that forked workers compute distances over
+shared_graph = None
+
+
+def choose_landmarks(graph, count):
+    """
+    Picks up to count people who starred in the most movies,
+    skipping anyone who shares a movie with a landmark already
+    chosen so the landmarks are spread across the graph.
+    """
+    people = sorted(
+        range(len(graph.person_ids)),
+        key=lambda person: -len(graph.movies_of(person))
+    )
+    chosen = []
+    covered = set()
+    for person in people:
+        if len(chosen) == count:
+            break
+        movies = graph.movies_of(person)
+        if not len(movies) or any(movie in covered for movie in movies):
+            continue
+        chosen.append(person)
+        covered.update(movies)
+    return chosen
+
+
+def distances_from(landmark, graph=None):
+    """
+    Returns a bytearray holding the degrees of separation
+    from landmark to every person in the graph.
+    """
+    graph = graph or shared_graph
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_people = graph.movie_people
+
+    distance = bytearray([UNREACHABLE]) * (len(person_offsets) - 1)
+    seen_movies = bytearray(len(movie_offsets) - 1)
+    distance[landmark] = 0
+    frontier = [landmark]
+    depth = 0
+    while frontier and depth < UNREACHABLE - 1:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[
+                person_offsets[person]:person_offsets[person + 1]
+            ]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in movie_people[
+                    movie_offsets[movie]:movie_offsets[movie + 1]
+                ]:
+                    if distance[star] == UNREACHABLE:
+                        distance[star] = depth
+                        next_frontier.append(star)
+        frontier = next_frontier
+    return distance
+
+
+class LandmarkIndex():
+    """
+    Distances from a set of landmarks to every person, stored person
+    by person so that all of one person's distances are contiguous.
+
+    requested is the number of landmarks asked for, which is more than
+    count when the graph has too few people far enough apart.
+    """
+
+    def __init__(self, graph, landmarks, distances, requested=None):
+        self.graph = graph
+        self.landmarks = memoryview(landmarks)
+        self.distances = memoryview(distances)
+        self.count = len(self.landmarks)
+        self.requested = self.count if requested is None else requested
+
+    @classmethod
+    def build(cls, graph, count, workers=1):
+        """
+        Chooses count landmarks and computes their distances, one
+        landmark per task across a pool of forked worker processes.
+        """
+        global shared_graph
+        landmarks = array("i", choose_landmarks(graph, count))
+        if (workers > 1 and len(landmarks) > 1
+                and "fork" in multiprocessing.get_all_start_methods()):
+            shared_graph = graph
+            context = multiprocessing.get_context("fork")
+            with context.Pool(min(workers, len(landmarks))) as pool:
+                columns = pool.map(distances_from, landmarks)
+            shared_graph = None
+        else:
+            columns = [distances_from(landmark, graph)
+                       for landmark in landmarks]
+
+        distances = bytearray(len(landmarks) * len(graph.person_ids))
+        for i, column in enumerate(columns):
+            distances[i::len(landmarks)] = column
+        return cls(graph, landmarks, distances, count)
+
+    @classmethod
+    def load(cls, graph, path, sources):
+        """
+        Memory-maps a saved index, or returns None if it is missing
+        or older than any of the source files.
+        """
+        sections = snapshot.read(path, sources)
+        if sections is None or "distances" not in sections:
+            return None
+        if len(sections["distances"]) != (len(sections["landmarks"])
+                                          * len(graph.person_ids)):
+            return None
+        requested = sections.get("requested")
+        return cls(graph, sections["landmarks"], sections["distances"],
+                   requested[0] if requested is not None else None)
+
+    def save(self, path, sources):
+        snapshot.write(
+            path,
+            {"landmarks": self.landmarks, "distances": self.distances,
+             "requested": array("i", [self.requested])},
+            sources
+        )
+
+    def distances_to(self, person):
+        """Returns a person's distance from every landmark."""
+        start = person * self.count
+        return self.distances[start:start + self.count]
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper, landmark): bounds on the degrees of
+        separation between two people in the same component, and the
+        landmark whose detour through it achieves the upper bound.
+        """
+        lower = 0
+        upper = UNREACHABLE * 2
+        best = None
+        for i, (a, b) in enumerate(zip(self.distances_to(source),
+                                       self.distances_to(target))):
+            if a == UNREACHABLE or b == UNREACHABLE:
+                continue
+            lower = max(lower, abs(a - b))
+            if a + b < upper:
+                upper = a + b
+                best = i
+        return lower, upper, best
+
+    def shortest_path(self, source_id, target_id, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, or None.
+        If a SearchStats is given, the search's counters are added to it.
+
+        The detour through the best landmark gives a path of known
+        length. When it matches the lower bound it is returned without
+        any search. Otherwise the bidirectional search only looks for a
+        strictly shorter path, which spares it the final and largest
+        layer whenever the detour turns out to be optimal.
+        """
+        graph = self.graph
+        source = graph.person_index(source_id)
+        target = graph.person_index(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return []
+        if graph.component[source] != graph.component[target]:
+            return None
+
+        lower, upper, landmark = self.bounds(source, target)
+        if landmark is None:
+            return graph.shortest_path(source_id, target_id, stats=stats)
+        if lower < upper:
+            path = graph.shortest_path(source_id, target_id,
+                                       max_degrees=upper - 1, stats=stats)
+            if path is not None:
+                return path
+        return self.path_via(source, target, landmark)
+
+    def walk_to(self, person, landmark):
+        """
+        Returns the (movie, person) index pairs of a shortest path from
+        person to the landmark at position landmark, by repeatedly
+        stepping to a co-star one degree closer to it.
+        """
+        graph = self.graph
+        count = self.count
+        distances = self.distances
+        steps = []
+        distance = distances[person * count + landmark]
+        while distance:
+            distance -= 1
+            for movie in graph.movies_of(person):
+                for star in graph.stars_of(movie):
+                    if distances[star * count + landmark] == distance:
+                        break
+                else:
+                    continue
+                break
+            steps.append((movie, star))
+            person = star
+        return steps
+
+    def path_via(self, source, target, landmark):
+        """
+        Returns the path from source to target that detours through
+        the landmark at position landmark, as (movie_id, person_id) pairs.
+        """
+        graph = self.graph
+        outward = self.walk_to(source, landmark)
+
+        # Walk from the target to the landmark, then reverse it
+        inward = []
+        person = target
+        for movie, star in self.walk_to(target, landmark):
+            inward.append((movie, person))
+            person = star
+        inward.reverse()
+
+        return [(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in outward + inward]
+
+
+def load_or_build(graph, count, directory, sources, workers=None):
+    """
+    Returns the landmark index for the graph in directory, building
+    and saving it first if there is no up-to-date one on disk.
+    """
+    path = os.path.join(directory, "degrees.landmarks")
+    index = LandmarkIndex.load(graph, path, sources)
+    if index is None or index.requested != count:
+        index = LandmarkIndex.build(graph, count, workers or os.cpu_count())
+        try:
+            index.save(path, sources)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,131 @@
+"""
+Prefix and fuzzy lookup over lowercased person names.
+
+Names are kept in a sorted sequence, so every name starting with a
+prefix sits in one contiguous run found by binary search. For fuzzy
+matching, every name is broken into trigrams ("tom" -> "  t", " to",
+"tom", "om ") and an inverted index maps each trigram to the names
+containing it, stored in CSR form like the graph itself.
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+# Names scored exactly per suggestion asked for
+CANDIDATES = 20
+
+
+def trigrams(name):
+    """Returns the set of padded trigrams of a lowercased name."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Sorted names plus a trigram inverted index over them.
+
+    keys is a sorted sequence of lowercased names, which may repeat.
+    The postings of trigram_keys[i] are the positions
+    trigram_postings[trigram_offsets[i]:trigram_offsets[i + 1]] in keys,
+    one per distinct name.
+    """
+
+    def __init__(self, keys, trigram_keys, trigram_offsets, trigram_postings):
+        self.keys = keys
+        self.trigram_keys = trigram_keys
+        self.trigram_offsets = memoryview(trigram_offsets)
+        self.trigram_postings = memoryview(trigram_postings)
+
+    @classmethod
+    def build(cls, keys):
+        """
+        Builds the trigram index over a sorted sequence of names.
+        """
+        postings = {}
+        previous = None
+        for position, key in enumerate(keys):
+            if key == previous:
+                continue
+            previous = key
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, []).append(position)
+
+        trigram_keys = sorted(postings)
+        trigram_offsets = array("i", [0])
+        trigram_postings = array("i")
+        for trigram in trigram_keys:
+            trigram_postings.extend(postings[trigram])
+            trigram_offsets.append(len(trigram_postings))
+        return cls(keys, trigram_keys, trigram_offsets, trigram_postings)
+
+    def postings(self, trigram):
+        """Returns the positions of the names containing trigram."""
+        i = bisect_left(self.trigram_keys, trigram)
+        if i == len(self.trigram_keys) or self.trigram_keys[i] != trigram:
+            return self.trigram_postings[0:0]
+        return self.trigram_postings[
+            self.trigram_offsets[i]:self.trigram_offsets[i + 1]
+        ]
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit distinct names starting with prefix,
+        shortest and then alphabetically first.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(matches) < limit:
+            key = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            if not matches or matches[-1] != key:
+                matches.append(key)
+            i += 1
+        return sorted(matches, key=lambda key: (len(key), key))
+
+    def fuzzy(self, text, limit=10, threshold=0.3):
+        """
+        Returns up to limit (similarity, name) pairs, most similar
+        first, for names whose trigram Jaccard similarity to text
+        is at least threshold.
+
+        Only names sharing at least half of the n query trigrams are
+        looked for. Any such name contains one of the n - ceil(n / 2) + 1
+        rarest of them, so only those postings are counted. The names
+        seen most often there are then scored exactly.
+        """
+        query = trigrams(text.lower())
+        rarest = sorted((self.postings(trigram) for trigram in query),
+                        key=len)[:len(query) - math.ceil(len(query) / 2) + 1]
+
+        counts = Counter()
+        for positions in rarest:
+            counts.update(positions)
+
+        scored = []
+        for position, _ in counts.most_common(CANDIDATES * limit):
+            key = self.keys[position]
+            grams = trigrams(key)
+            shared = len(query & grams)
+            score = shared / (len(query) + len(grams) - shared)
+            if score >= threshold:
+                scored.append((score, key))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
+
+    def suggest(self, text, limit=10):
+        """
+        Returns up to limit distinct names ranked for text:
+        an exact match first, then names it is a prefix of,
+        then the closest fuzzy matches.
+        """
+        suggestions = self.prefix(text, limit)
+        if len(suggestions) < limit:
+            for _, key in self.fuzzy(text, limit):
+                if key not in suggestions:
+                    suggestions.append(key)
+        return suggestions[:limit]
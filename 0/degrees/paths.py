@@ -0,0 +1,92 @@
+"""
+Lazy enumeration of every shortest path between two people.
+
+A layered bidirectional breadth-first search records, for each person
+it reaches, every edge that reaches them from the previous layer. Those
+edges form a DAG of all shortest paths, whose size is bounded by the
+part of the graph searched. The paths themselves are only produced one
+at a time, by walking the DAG, so there may be exponentially many of
+them without any being held in memory at once.
+"""
+
+
+def expand_all(frontier, parents, other, neighbors):
+    """
+    Expands the whole frontier by one layer, recording every edge
+    into each newly reached person in parents.
+
+    Returns the next frontier and the people in it that the other
+    side has already reached.
+    """
+    layer = {}
+    for person in frontier:
+        for movie, star in neighbors(person):
+            if star in layer:
+                layer[star].append((movie, person))
+            elif star not in parents:
+                layer[star] = [(movie, person)]
+    parents.update(layer)
+    return list(layer), [person for person in layer if person in other]
+
+
+def paths_to(person, parents):
+    """
+    Yields each path from the root of parents to person,
+    as lists of (movie, person) pairs.
+    """
+    if not parents[person]:
+        yield []
+        return
+    for movie, parent in parents[person]:
+        for path in paths_to(parent, parents):
+            path.append((movie, person))
+            yield path
+
+
+def paths_from(person, parents):
+    """
+    Yields each path from person to the root of parents,
+    as lists of (movie, person) pairs.
+    """
+    if not parents[person]:
+        yield []
+        return
+    for movie, parent in parents[person]:
+        for path in paths_from(parent, parents):
+            yield [(movie, parent)] + path
+
+
+def all_shortest_paths(source, target, neighbors):
+    """
+    Yields every shortest path from source to target as a list of
+    (movie, person) pairs, where neighbors(person) returns the
+    (movie, person) pairs of a person's co-stars.
+
+    Each side is grown a whole layer at a time, smaller side first,
+    so that when the sides first meet every meeting person lies on a
+    shortest path and every edge into them has been recorded.
+    """
+    if source == target:
+        yield []
+        return
+
+    # Maps each reached person to the edges leading back to that side's root
+    forward = {source: []}
+    backward = {target: []}
+    forward_frontier = [source]
+    backward_frontier = [target]
+    meet = []
+    while forward_frontier and backward_frontier and not meet:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meet = expand_all(
+                forward_frontier, forward, backward, neighbors
+            )
+        else:
+            backward_frontier, meet = expand_all(
+                backward_frontier, backward, forward, neighbors
+            )
+
+    for person in meet:
+        for head in paths_to(person, forward):
+            for tail in paths_from(person, backward):
+                yield head + tail
@@ -0,0 +1,194 @@
+"""
+Long-running HTTP query server for degrees.
+
+Keeps the loaded graph resident and answers
+
+    GET /path?source=...&target=...   (person IDs or unambiguous names)
+    GET /names?q=...[&limit=N]        (ranked name suggestions)
+    GET /stats
+
+with JSON, from a bounded LRU cache of recent results when it can.
+Started by `python degrees.py --serve [HOST:]PORT`.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from util import SearchStats
+
+
+class LRUCache():
+    """
+    Thread-safe mapping that holds at most size entries,
+    evicting the least recently used one first.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class QueryServer(ThreadingHTTPServer):
+    """
+    HTTP server answering each request on its own thread.
+
+    resolve turns a name or ID into a person_id, raising LookupError
+    if it can't; search(source, target, stats) returns a path or None
+    and adds its counters to the SearchStats it is given;
+    suggest(text, limit) returns a ranked list of matching people.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, resolve, search, suggest, cache_size=1024):
+        super().__init__(address, QueryHandler)
+        self.resolve = resolve
+        self.search = search
+        self.suggest = suggest
+        self.cache = LRUCache(cache_size)
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.total_latency = 0.0
+
+    def query(self, source, target):
+        """
+        Answers one query, returning a JSON-serializable dict.
+        """
+        start = time.perf_counter()
+        answer = {"source": source, "target": target}
+        try:
+            source_id = self.resolve(source)
+            target_id = self.resolve(target)
+        except LookupError as e:
+            answer["error"] = e.args[0]
+            return answer
+
+        key = (source_id, target_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            path, expanded = cached
+            answer["cached"] = True
+        else:
+            stats = SearchStats()
+            path = self.search(source_id, target_id, stats)
+            expanded = stats.expanded
+            self.cache.put(key, (path, expanded))
+            answer["cached"] = False
+
+        answer["degrees"] = None if path is None else len(path)
+        answer["path"] = None if path is None else [
+            {"movie_id": movie_id, "person_id": person_id}
+            for movie_id, person_id in path
+        ]
+        answer["expanded"] = expanded
+        latency = time.perf_counter() - start
+        answer["latency_ms"] = round(1000 * latency, 3)
+        with self.lock:
+            self.queries += 1
+            self.total_latency += latency
+        return answer
+
+    def summary(self):
+        """
+        Returns counters describing everything served so far.
+        """
+        with self.lock:
+            queries = self.queries
+            total_latency = self.total_latency
+        return {
+            "queries": queries,
+            "mean_latency_ms": (round(1000 * total_latency / queries, 3)
+                                if queries else None),
+            "cache_entries": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses
+        }
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1]
+                  for key, values in parse_qs(url.query).items()}
+        if url.path == "/path":
+            if "source" not in params or "target" not in params:
+                return self.reply(
+                    400, {"error": "source and target are required"}
+                )
+            answer = self.server.query(params["source"], params["target"])
+            self.reply(404 if "error" in answer else 200, answer)
+        elif url.path == "/names":
+            try:
+                limit = int(params.get("limit", 10))
+            except ValueError:
+                return self.reply(400, {"error": "limit must be a number"})
+            self.reply(200, self.server.suggest(params.get("q", ""), limit))
+        elif url.path == "/stats":
+            self.reply(200, self.server.summary())
+        else:
+            self.reply(404, {"error": f"no such endpoint: {url.path}"})
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_address(text):
+    """
+    Parses "[HOST:]PORT" into a (host, port) tuple,
+    defaulting to localhost.
+    """
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def serve(address, resolve, search, suggest, cache_size=1024):
+    """
+    Serves queries on address until interrupted.
+    """
+    server = QueryServer(address, resolve, search, suggest, cache_size)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port}/path?source=...&target=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
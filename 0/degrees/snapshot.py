@@ -0,0 +1,188 @@
+"""
+Binary snapshot files that can be memory-mapped instead of parsed.
+
+A snapshot is a magic number, a JSON header and a sequence of 8-byte
+aligned sections. Each section is either a flat array of numbers,
+which is mapped straight back into a memoryview, or a table of strings,
+which is stored as a UTF-8 blob plus an offsets array and decoded
+lazily one entry at a time. The header also records the size and
+modification time of the files the snapshot was built from, so a
+snapshot is ignored as soon as any of them changes.
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+
+MAGIC = b"DEGSNAP1"
+VERSION = 1
+ALIGN = 8
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored in a snapshot.
+
+    Behaves enough like a list for indexing, len(), iteration and
+    the bisect module.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def fingerprint(paths):
+    """
+    Returns the (size, mtime_ns) of each path, used to
+    tell whether a snapshot is still up to date.
+    """
+    stamps = {}
+    for path in paths:
+        stat = os.stat(path)
+        stamps[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def write(path, sections, sources):
+    """
+    Writes sections (a dict of name -> array, memoryview or list of str)
+    to path, stamped with the fingerprint of the source files.
+
+    The file is written to a temporary name and renamed into place,
+    so a reader never sees a partial snapshot.
+    """
+    chunks = []
+    layout = {}
+    offset = 0
+
+    def add(data):
+        nonlocal offset
+        padding = -offset % ALIGN
+        if padding:
+            chunks.append(b"\0" * padding)
+            offset += padding
+        chunks.append(data)
+        start = offset
+        offset += len(data)
+        return start
+
+    for name, values in sections.items():
+        if isinstance(values, (array, memoryview)):
+            values = memoryview(values)
+            layout[name] = {
+                "kind": "array",
+                "typecode": values.format,
+                "offset": add(values.tobytes()),
+                "count": len(values)
+            }
+        else:
+            encoded = [value.encode("utf-8") for value in values]
+            offsets = array("q", [0])
+            total = 0
+            for value in encoded:
+                total += len(value)
+                offsets.append(total)
+            layout[name] = {
+                "kind": "strings",
+                "count": len(encoded),
+                "offsets": add(offsets.tobytes()),
+                "blob": add(b"".join(encoded)),
+                "size": total
+            }
+
+    header = json.dumps({
+        "version": VERSION,
+        "sources": fingerprint(sources),
+        "sections": layout
+    }).encode("utf-8")
+    preamble = MAGIC + struct.pack("<Q", len(header)) + header
+    preamble += b"\0" * (-len(preamble) % ALIGN)
+
+    temporary = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(preamble)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temporary, path)
+    except OSError:
+        # Don't leave a partial snapshot behind
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read(path, sources):
+    """
+    Memory-maps the snapshot at path and returns its sections
+    as a dict of name -> memoryview or StringTable.
+
+    Returns None if there is no snapshot, it is not a snapshot of this
+    version, it is truncated or corrupt, or any of the source files
+    changed since it was written.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(data)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        return None
+
+    def section(offset, size):
+        """Returns size bytes of view from offset, which must fit."""
+        if offset < 0 or size < 0 or offset + size > len(view):
+            raise ValueError("section runs past the end of the snapshot")
+        return view[offset:offset + size]
+
+    # A truncated or corrupt snapshot is treated like a missing one
+    try:
+        start = len(MAGIC) + 8
+        (length,) = struct.unpack("<Q", view[len(MAGIC):start])
+        header = json.loads(bytes(section(start, length)))
+        if header["version"] != VERSION:
+            return None
+        try:
+            if header["sources"] != fingerprint(sources):
+                return None
+        except OSError:
+            return None
+
+        base = start + length
+        base += -base % ALIGN
+        sections = {}
+        for name, entry in header["sections"].items():
+            if entry["kind"] == "array":
+                size = array(entry["typecode"]).itemsize * entry["count"]
+                sections[name] = section(base + entry["offset"], size).cast(
+                    entry["typecode"]
+                )
+            else:
+                offsets = section(base + entry["offsets"],
+                                  8 * (entry["count"] + 1))
+                blob = section(base + entry["blob"], entry["size"])
+                sections[name] = StringTable(offsets.cast("q"), blob)
+    except (struct.error, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return sections
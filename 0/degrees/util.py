@@ -1,4 +1,10 @@
+import heapq
+from collections import deque
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -6,24 +12,45 @@ class Node():
 
 
 class StackFrontier():
+    """
+    Last-in first-out frontier. Alongside the nodes it keeps a count
+    of how many of them hold each state, so that add, remove and
+    contains_state all take constant time.
+    """
+
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.track(node.state)
+
+    def track(self, state):
+        self.states[state] = self.states.get(state, 0) + 1
+
+    def untrack(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def __len__(self):
+        return len(self.frontier)
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.untrack(node.state)
             return node
 
 
@@ -33,6 +60,77 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.untrack(node.state)
+            return node
+
+
+class PriorityFrontier(StackFrontier):
+    """
+    Binary-heap frontier that always removes the node with the lowest
+    priority, for best-first and A* search. Nodes with equal priority
+    come out in the order they were added.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.count = 0
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, self.count, node))
+        self.count += 1
+        self.track(node.state)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self.untrack(node.state)
             return node
+
+
+class SearchStats():
+    """
+    Counters that a search fills in when one is passed to it.
+    Searches run without one skip all of this bookkeeping.
+    """
+    __slots__ = ("expanded", "edges", "layers", "peak_frontier",
+                 "neighbor_time", "total_time")
+
+    def __init__(self):
+        # People whose co-stars were scanned
+        self.expanded = 0
+        # (movie, person) pairs looked at while scanning them
+        self.edges = 0
+        # Frontier layers expanded, and the most people waiting in
+        # the frontiers at once
+        self.layers = 0
+        self.peak_frontier = 0
+        # Seconds spent finding co-stars, and in the whole search
+        self.neighbor_time = 0.0
+        self.total_time = 0.0
+
+    @property
+    def queue_time(self):
+        """Seconds spent on frontier and visited-set bookkeeping."""
+        return max(self.total_time - self.neighbor_time, 0.0)
+
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "edges": self.edges,
+            "layers": self.layers,
+            "peak_frontier": self.peak_frontier,
+            "neighbor_ms": round(1000 * self.neighbor_time, 3),
+            "queue_ms": round(1000 * self.queue_time, 3),
+            "total_ms": round(1000 * self.total_time, 3)
+        }
+
+    def __str__(self):
+        return (f"{self.expanded} people expanded, {self.edges} edges "
+                f"scanned in {self.layers} layers, peak frontier "
+                f"{self.peak_frontier}; {1000 * self.total_time:.3f} ms "
+                f"total, {1000 * self.neighbor_time:.3f} ms finding "
+                f"co-stars, {1000 * self.queue_time:.3f} ms in queues")
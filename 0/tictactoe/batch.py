@@ -0,0 +1,65 @@
+"""
+Vectorized evaluation of many Tic Tac Toe boards at once.
+
+Boards are held in an int8 NumPy array of shape (N, 3, 3), with 1 for
+X, -1 for O and 0 for an empty cell, and every function answers for
+all N boards in one pass. Boards are assumed to be legal positions, so
+at most one player has a line.
+"""
+
+import numpy as np
+
+import bitboard
+from tictactoe import X, O
+
+# The cells of each winning line, numbered 0-8 row by row
+LINES = np.array([[cell for cell in range(9) if line >> cell & 1]
+                  for line in bitboard.LINES])
+
+VALUES = {X: 1, O: -1}
+
+
+def from_boards(boards):
+    """
+    Returns the (N, 3, 3) array of a sequence of list-of-lists boards.
+    """
+    return np.array([[[VALUES.get(cell, 0) for cell in row] for row in board]
+                     for board in boards], dtype=np.int8).reshape(-1, 3, 3)
+
+
+def winner(boards):
+    """
+    Returns an int8 array holding 1 where X has won, -1 where O has
+    won and 0 elsewhere.
+    """
+    cells = boards.reshape(-1, 9)
+    sums = cells[:, LINES].sum(axis=2, dtype=np.int8)
+    return (sums == 3).any(axis=1).astype(np.int8) - (sums == -3).any(axis=1)
+
+
+def terminal(boards, winners=None):
+    """
+    Returns a bool array, True where the game is over. The winner
+    array may be passed in when it has already been computed.
+    """
+    if winners is None:
+        winners = winner(boards)
+    return (winners != 0) | boards.reshape(-1, 9).all(axis=1)
+
+
+def player(boards):
+    """
+    Returns an int8 array holding 1 where X has the next turn
+    and -1 where O does.
+    """
+    # X moves first, so the marks sum to 0 exactly when it is X's turn
+    marks = boards.reshape(-1, 9).sum(axis=1, dtype=np.int8)
+    return np.where(marks == 0, 1, -1).astype(np.int8)
+
+
+def evaluate(boards):
+    """
+    Returns the (winner, terminal, player) arrays of the boards.
+    """
+    winners = winner(boards)
+    return winners, terminal(boards, winners), player(boards)
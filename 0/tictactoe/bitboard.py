@@ -0,0 +1,335 @@
+"""
+Bitboard Tic Tac Toe engine.
+
+A position is a pair of 9-bit integers (x, o), one per player, with bit
+3 * i + j set when that player has a mark on cell (i, j). Every question
+about a position is answered by looking one of these masks up in a
+table of all 512 of them, built once at import.
+
+Run directly to compare the nodes each search variant visits.
+"""
+
+FULL = 0b111111111
+
+# The 8 winning lines: rows, columns, then diagonals
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# The 8 rotations and reflections of the board, each as the cell
+# (numbered 0-8 row by row) that lands on cell 0, 1, ..., 8
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0)
+]
+
+
+def permute(mask, symmetry):
+    """Returns mask with its cells moved by symmetry."""
+    return sum(1 << cell for cell, source in enumerate(symmetry)
+               if mask >> source & 1)
+
+
+# BITS[cell] is the mask of cell alone
+BITS = tuple(1 << cell for cell in range(9))
+
+# WINS[mask] is 1 when mask covers a whole line
+WINS = bytes(any(mask & line == line for line in LINES)
+             for mask in range(FULL + 1))
+
+# COUNTS[mask] is the number of cells set in mask
+COUNTS = bytes(bin(mask).count("1") for mask in range(FULL + 1))
+
+# MOVES[mask] lists the cells not set in mask
+MOVES = [tuple(cell for cell in range(9) if not mask >> cell & 1)
+         for mask in range(FULL + 1)]
+
+# TRANSFORMS[k][mask] is mask under the k-th symmetry
+TRANSFORMS = [[permute(mask, symmetry) for mask in range(FULL + 1)]
+              for symmetry in SYMMETRIES]
+
+# Cells in the order search tries them: the center, the corners, then
+# the edges, since those take part in the most lines
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# ORDERED_MOVES[mask] lists the cells not set in mask in that order
+ORDERED_MOVES = [tuple(cell for cell in ORDER if not mask >> cell & 1)
+                 for mask in range(FULL + 1)]
+
+
+def with_first(moves_table):
+    """
+    Returns tables[first][mask]: moves_table[mask] with cell first
+    moved to the front when it is empty.
+    """
+    return [[(first,) + tuple(cell for cell in moves if cell != first)
+             if first in moves else moves
+             for moves in moves_table]
+            for first in range(9)]
+
+
+# DIGITS[mask] is mask read as a base 3 number with a 1 per cell set
+DIGITS = [sum(3 ** cell for cell in range(9) if mask >> cell & 1)
+          for mask in range(FULL + 1)]
+
+# Canonical keys by index(x, o), filled in as they are first needed
+CANONICAL = [-1] * 3 ** 9
+
+# Bounds on the value of each position searched, by canonical key
+transpositions = {}
+
+
+def x_to_move(x, o):
+    """Returns True if X has the next turn, False if O does."""
+    return COUNTS[x] == COUNTS[o]
+
+
+def utility(x, o):
+    """Returns 1 if X has won, -1 if O has won, 0 otherwise."""
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    return 0
+
+
+def terminal(x, o):
+    """Returns True if the game is over."""
+    return bool(WINS[x] or WINS[o]) or x | o == FULL
+
+
+def moves(x, o):
+    """Returns the empty cells."""
+    return MOVES[x | o]
+
+
+def play(x, o, cell):
+    """Returns the position after the player to move marks cell."""
+    if COUNTS[x] == COUNTS[o]:
+        return x | 1 << cell, o
+    return x, o | 1 << cell
+
+
+def index(x, o):
+    """
+    Returns a distinct number below 3^9 for each position: the board
+    read as a base 3 number, with each cell 0 if empty, 1 for X, 2 for O.
+    """
+    return DIGITS[x] + 2 * DIGITS[o]
+
+
+def canonical(x, o):
+    """
+    Returns the same integer for a position and all of its rotations
+    and reflections: the smallest of their 18-bit encodings.
+    """
+    return min(transform[x] << 9 | transform[o] for transform in TRANSFORMS)
+
+
+class GameState():
+    """
+    Mutable position for search. push(cell) marks cell for the player
+    to move and pop() takes the last move back, both in place, keeping
+    the move count and the winner up to date as they go.
+    """
+    __slots__ = ("x", "o", "count", "winner", "history")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+        self.count = COUNTS[x] + COUNTS[o]
+        self.winner = utility(x, o)
+        self.history = [None] * 9
+
+    def push(self, cell):
+        count = self.count
+        self.history[count] = cell
+        self.count = count + 1
+
+        # Only the player who just moved can have won
+        if count & 1:
+            o = self.o = self.o | BITS[cell]
+            if WINS[o]:
+                self.winner = -1
+        else:
+            x = self.x = self.x | BITS[cell]
+            if WINS[x]:
+                self.winner = 1
+
+    def pop(self):
+        # Moves are never pushed once the game is won
+        count = self.count = self.count - 1
+        if count & 1:
+            self.o ^= BITS[self.history[count]]
+        else:
+            self.x ^= BITS[self.history[count]]
+        self.winner = 0
+
+
+class SearchStats():
+    __slots__ = ("nodes", "cutoffs")
+
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+
+
+class AlphaBeta():
+    """
+    Alpha-beta search over a GameState, optionally memoized in a
+    transposition table of (lower, upper) value bounds by canonical
+    key, trying moves center and corners first and, with killers,
+    trying first the move that last caused a cutoff at the same depth.
+    Moves are made and taken back in place, and every move list it
+    tries is built in advance, so no boards or lists are built per node.
+    """
+
+    def __init__(self, table=None, ordering=True, killers=True):
+        self.table = table
+        self.moves = ORDERED_MOVES if ordering else MOVES
+        self.killer_moves = with_first(self.moves) if killers else None
+        self.killers = [None] * 10
+        self.stats = SearchStats()
+
+    def value(self, state, alpha=-1, beta=1, ply=0):
+        """
+        Returns the utility of the position under optimal play if it
+        lies strictly between alpha and beta, or else a bound beyond
+        whichever of them it falls outside.
+        """
+        self.stats.nodes += 1
+        if state.winner:
+            return state.winner
+        x, o = state.x, state.o
+        if x | o == FULL:
+            return 0
+
+        table = self.table
+        if table is not None:
+            i = DIGITS[x] + 2 * DIGITS[o]
+            key = CANONICAL[i]
+            if key < 0:
+                key = CANONICAL[i] = canonical(x, o)
+            lower, upper = table.get(key, (-1, 1))
+            if lower == upper or lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            alpha_in, beta_in = max(alpha, lower), min(beta, upper)
+            alpha, beta = alpha_in, beta_in
+
+        killer = self.killers[ply]
+        if killer is not None and self.killer_moves is not None:
+            moves = self.killer_moves[killer][x | o]
+        else:
+            moves = self.moves[x | o]
+
+        x_turn = not state.count & 1
+        best = -1 if x_turn else 1
+        for cell in moves:
+            state.push(cell)
+            res = self.value(state, alpha, beta, ply + 1)
+            state.pop()
+            if x_turn:
+                if res > best:
+                    best = res
+                    alpha = max(alpha, res)
+            elif res < best:
+                best = res
+                beta = min(beta, res)
+            if alpha >= beta:
+                self.stats.cutoffs += 1
+                if self.killer_moves is not None:
+                    self.killers[ply] = cell
+                break
+
+        if table is not None:
+            if best <= alpha_in:
+                upper = best
+            elif best >= beta_in:
+                lower = best
+            else:
+                lower = upper = best
+            table[key] = (lower, upper)
+        return best
+
+    def best_move(self, x, o):
+        """
+        Returns (value, cell): the value of the position and an optimal
+        cell for the player to move, or (utility, None) if the game
+        is over.
+        """
+        if terminal(x, o):
+            return utility(x, o), None
+        state = GameState(x, o)
+        x_turn = not state.count & 1
+        alpha, beta = -1, 1
+        best = None
+        for cell in self.moves[x | o]:
+            state.push(cell)
+            res = self.value(state, alpha, beta, 1)
+            state.pop()
+            if best is None or (res > best[0] if x_turn else res < best[0]):
+                best = (res, cell)
+            if x_turn:
+                alpha = max(alpha, res)
+            else:
+                beta = min(beta, res)
+            if alpha >= beta:
+                break
+        return best
+
+
+def minimax_value(x, o, stats=None):
+    """
+    Returns the utility of the position under optimal play by plain
+    minimax, without pruning or memoization, counting nodes in stats.
+    """
+    if stats is not None:
+        stats.nodes += 1
+    if terminal(x, o):
+        return utility(x, o)
+    values = [minimax_value(*play(x, o, cell), stats)
+              for cell in MOVES[x | o]]
+    return max(values) if COUNTS[x] == COUNTS[o] else min(values)
+
+
+# Search used by best_move, memoized across calls
+engine = AlphaBeta(transpositions)
+
+
+def best_move(x, o):
+    """
+    Returns (value, cell) for the position from the shared engine.
+    """
+    return engine.best_move(x, o)
+
+
+def compare_searches():
+    """
+    Prints the nodes each search visits solving the empty board.
+    """
+    stats = SearchStats()
+    minimax_value(0, 0, stats)
+    print(f"{'minimax':>24}: {stats.nodes:>7} nodes")
+    for name, search in [
+        ("alpha-beta", AlphaBeta(ordering=False, killers=False)),
+        ("+ move ordering", AlphaBeta(killers=False)),
+        ("+ killer moves", AlphaBeta()),
+        ("+ transposition table", AlphaBeta({}))
+    ]:
+        search.best_move(0, 0)
+        print(f"{name:>24}: {search.stats.nodes:>7} nodes, "
+              f"{search.stats.cutoffs} cutoffs")
+
+
+if __name__ == "__main__":
+    compare_searches()
@@ -0,0 +1,80 @@
+"""
+Perfect-play opening book for Tic Tac Toe.
+
+Every position reachable from the empty board is solved once and an
+optimal cell for the player to move is stored in a table of 3^9 bytes,
+indexed by reading the board as a base 3 number (empty 0, X 1, O 2 per
+cell). Terminal and unreachable positions hold NO_MOVE.
+
+Usage: python book.py    (writes tictactoe.book next to this file)
+"""
+
+import os
+
+import bitboard
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    "tictactoe.book")
+SIZE = 3 ** 9
+NO_MOVE = 255
+
+# Table loaded on first lookup: None until then, False if missing
+table = None
+
+
+def build():
+    """
+    Solves every position reachable from the empty board,
+    returning the table of optimal cells.
+    """
+    moves = bytearray([NO_MOVE]) * SIZE
+    search = bitboard.AlphaBeta({})
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        if (x, o) in seen or bitboard.terminal(x, o):
+            continue
+        seen.add((x, o))
+        moves[bitboard.index(x, o)] = search.best_move(x, o)[1]
+        for cell in bitboard.moves(x, o):
+            stack.append(bitboard.play(x, o, cell))
+    return moves
+
+
+def load(path=PATH):
+    """
+    Returns the table saved at path, or None if there is no valid one.
+    """
+    try:
+        with open(path, "rb") as f:
+            moves = f.read(SIZE + 1)
+    except OSError:
+        return None
+    return moves if len(moves) == SIZE else None
+
+
+def lookup(x, o):
+    """
+    Returns the book's optimal cell for (x, o), or None if the book
+    is missing or has no move for it. The book is read on first use.
+    """
+    global table
+    if table is None:
+        table = load() or False
+    if not table:
+        return None
+    cell = table[bitboard.index(x, o)]
+    return None if cell == NO_MOVE else cell
+
+
+def main():
+    moves = build()
+    with open(PATH, "wb") as f:
+        f.write(moves)
+    positions = SIZE - moves.count(NO_MOVE)
+    print(f"Wrote {positions} positions to {PATH}")
+
+
+if __name__ == "__main__":
+    main()
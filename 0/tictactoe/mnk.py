@@ -0,0 +1,250 @@
+"""
+Generalized m,n,k-game: k in a row wins on a board of m rows and n
+columns, such as 4 in a row on 5x5.
+
+Game exposes the same functions as the tictactoe module, so runner.py
+can play either. Boards beyond 3x3 are far too big to search to the
+end, so minimax searches with iterative deepening: alpha-beta to depth
+1, 2, 3, ..., scoring the positions where it stops with a heuristic,
+until a wall-clock budget runs out. The move from the deepest search
+completed is played.
+"""
+
+import time
+
+from bitboard import SearchStats
+from tictactoe import X, O, EMPTY
+
+# Score of a win, less the number of moves it takes; any heuristic
+# score is far smaller
+WIN = 10 ** 9
+
+
+class TimeUp(Exception):
+    pass
+
+
+class Game():
+    X = X
+    O = O
+    EMPTY = EMPTY
+
+    def __init__(self, rows=3, cols=3, k=3, budget=1.0):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError("k must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.budget = budget
+        self.full = (1 << (rows * cols)) - 1
+
+        # Every line of k cells as a bitmask of cells, cell i * cols + j
+        self.lines = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    if (0 <= i + (k - 1) * di < rows
+                            and 0 <= j + (k - 1) * dj < cols):
+                        self.lines.append(sum(
+                            1 << ((i + s * di) * cols + j + s * dj)
+                            for s in range(k)
+                        ))
+        self.lines_through = [
+            [line for line in self.lines if line >> cell & 1]
+            for cell in range(rows * cols)
+        ]
+
+        # Search tries the central cells first
+        middle_i, middle_j = (rows - 1) / 2, (cols - 1) / 2
+        self.order = sorted(
+            range(rows * cols),
+            key=lambda cell: (abs(cell // cols - middle_i)
+                              + abs(cell % cols - middle_j))
+        )
+
+        # A line holding n of one player's marks and none of the
+        # other's is worth weights[n] to that player
+        self.weights = [0] + [10 ** n for n in range(k - 1)] + [WIN]
+
+        self.stats = SearchStats()
+        self.depth = 0
+        self.deadline = None
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def encode(self, board):
+        """
+        Returns the bitboard (x, o) of a board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (i * self.cols + j)
+                elif cell == O:
+                    o |= 1 << (i * self.cols + j)
+        return x, o
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x, o = self.encode(board)
+        return X if x.bit_count() == o.bit_count() else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i, row in enumerate(board)
+                for j, cell in enumerate(row) if cell is EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError
+        board1 = [list(row) for row in board]
+        board1[i][j] = self.player(board)
+        return board1
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        x, o = self.encode(board)
+        for line in self.lines:
+            if x & line == line:
+                return 1
+            if o & line == line:
+                return -1
+        return 0
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        return {1: X, -1: O}.get(self.utility(board))
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o = self.encode(board)
+        return self.utility(board) != 0 or x | o == self.full
+
+    def minimax(self, board):
+        """
+        Returns the best action found for the current player on the
+        board within the time budget, or None if the game is over.
+        """
+        if self.terminal(board):
+            return None
+        x, o = self.encode(board)
+        if x.bit_count() == o.bit_count():
+            cell = self.choose(x, o)
+        else:
+            cell = self.choose(o, x)
+        return divmod(cell, self.cols)
+
+    def wins(self, marks, cell):
+        """Returns True if marks complete a line through cell."""
+        return any(marks & line == line for line in self.lines_through[cell])
+
+    def evaluate(self, me, them):
+        """
+        Returns a heuristic score for the player to move, me: the
+        worth of the lines still open to me less those still open
+        to them.
+        """
+        weights = self.weights
+        score = 0
+        for line in self.lines:
+            if not line & them:
+                score += weights[(line & me).bit_count()]
+            elif not line & me:
+                score -= weights[(line & them).bit_count()]
+        return score
+
+    def choose(self, me, them):
+        """
+        Returns the cell to play for the player to move, me, searching
+        one ply deeper each time until the budget runs out.
+        """
+        self.deadline = time.perf_counter() + self.budget
+        empty = self.full & ~(me | them)
+        moves = [cell for cell in self.order if empty >> cell & 1]
+        for cell in moves:
+            if self.wins(me | 1 << cell, cell):
+                return cell
+
+        best = moves[0]
+        self.depth = 0
+        for depth in range(1, len(moves) + 1):
+            try:
+                score, cell = self.search_root(me, them, moves, depth)
+            except TimeUp:
+                break
+            best = cell
+            self.depth = depth
+
+            # Search the best move first next time
+            moves.remove(cell)
+            moves.insert(0, cell)
+            if abs(score) > WIN - len(self.order):
+                break
+        return best
+
+    def search_root(self, me, them, moves, depth):
+        """
+        Returns (score, cell) for the best of moves at depth.
+        """
+        alpha = -WIN - 1
+        best = moves[0]
+        for cell in moves:
+            score = -self.search(them, me | 1 << cell, depth - 1,
+                                 -WIN - 1, -alpha, 1)
+            if score > alpha:
+                alpha = score
+                best = cell
+        return alpha, best
+
+    def search(self, me, them, depth, alpha, beta, ply):
+        """
+        Returns the negamax score, for the player to move (me), of
+        the position searched depth more plies with alpha-beta.
+        """
+        stats = self.stats
+        stats.nodes += 1
+        if not stats.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise TimeUp
+
+        empty = self.full & ~(me | them)
+        if not empty:
+            return 0
+        if not depth:
+            return self.evaluate(me, them)
+
+        best = -WIN
+        for cell in self.order:
+            if not empty >> cell & 1:
+                continue
+            mine = me | 1 << cell
+            if self.wins(mine, cell):
+                return WIN - ply
+            score = -self.search(them, mine, depth - 1, -beta, -alpha,
+                                 ply + 1)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        stats.cutoffs += 1
+                        break
+        return best
@@ -1,8 +1,58 @@
+import argparse
+import multiprocessing
 import pygame
 import sys
 import time
-
-import tictactoe as ttt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import mnk
+import tictactoe
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--size", type=int, default=3,
+                    help="rows and columns on the board")
+parser.add_argument("-k", type=int, default=3,
+                    help="marks in a row needed to win")
+parser.add_argument("--budget", type=float, default=1.0,
+                    help="seconds the AI may think per move on boards "
+                         "bigger than 3x3")
+parser.add_argument("--frames", type=int, default=None,
+                    help="quit after this many frames, shutting down the "
+                         "AI worker as on closing the window, e.g. to run "
+                         "headless with SDL_VIDEODRIVER=dummy")
+args = parser.parse_args()
+
+# The tictactoe module and mnk.Game both provide the game's functions
+if args.size == 3 and args.k == 3:
+    ttt = tictactoe
+else:
+    ttt = mnk.Game(args.size, args.size, args.k, args.budget)
+
+# The AI thinks in a background worker so that the window keeps
+# responding meanwhile: a forked process where possible, so the search
+# doesn't hold the GIL the drawing needs, and a thread otherwise
+if "fork" in multiprocessing.get_all_start_methods():
+    executor = ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("fork")
+    )
+    # Fork the worker now, before pygame opens the window
+    executor.submit(int).result()
+else:
+    executor = ThreadPoolExecutor(1)
+
+
+def shutdown():
+    """
+    Stops the AI worker and exits. Waits for the worker to stop, which
+    takes at most one move's search: exiting first races the executor's
+    exit handler, which then writes to a pipe already closed.
+    """
+    executor.shutdown(cancel_futures=True)
+    sys.exit()
+
+
+# Seconds the AI appears to think for at least
+ai_delay = 0.5
 
 pygame.init()
 size = width, height = 600, 400
@@ -11,47 +61,106 @@ size = width, height = 600, 400
 black = (0, 0, 0)
 white = (255, 255, 255)
 
+# Frames drawn per second at most
+fps = 30
+
 screen = pygame.display.set_mode(size)
+clock = pygame.time.Clock()
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# Fit the board between the title and the button below it
+tile_size = min(80, (height - 160) // args.size)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
+
+# Rendered text, by font, text and color
+glyphs = {}
+
+
+def render(font, text, color):
+    key = (font, text, color)
+    if key not in glyphs:
+        glyphs[key] = font.render(text, True, color)
+    return glyphs[key]
+
+
+# What is drawn in each region of the screen, by its rectangle, and
+# the regions redrawn this frame. Only those are sent to the display.
+drawn = {}
+dirty = []
+
+
+def paint(rect, content, draw):
+    """
+    Redraws the region rect by calling draw(rect),
+    unless it already shows content.
+    """
+    key = tuple(rect)
+    if key in drawn and drawn[key] == content:
+        return
+    drawn[key] = content
+    screen.fill(black, rect)
+    draw(rect)
+    dirty.append(rect)
+
+
+def draw_text(font, text, color, center):
+    surface = render(font, text, color)
+    screen.blit(surface, surface.get_rect(center=center))
+
+
+def draw_button(text):
+    def draw(rect):
+        pygame.draw.rect(screen, white, rect)
+        draw_text(mediumFont, text, black, rect.center)
+    return draw
+
+
+def draw_tile(mark):
+    def draw(rect):
+        pygame.draw.rect(screen, white, rect, 3)
+        if mark != ttt.EMPTY:
+            draw_text(moveFont, mark, white, rect.center)
+    return draw
+
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+scene = None
+frames = 0
+
+# Future of the AI move being computed, and when it was asked for
+ai_move = None
+ai_started = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
-            sys.exit()
+            shutdown()
 
-    screen.fill(black)
+    # Start from a blank screen whenever switching between screens
+    if scene != (user is None):
+        scene = user is None
+        drawn.clear()
+        screen.fill(black)
+        dirty.append(screen.get_rect())
 
     # Let user choose a player.
     if user is None:
 
         # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
+        title = "Play Tic-Tac-Toe"
+        paint(pygame.Rect(0, 20, width, 60), title,
+              lambda rect: draw_text(largeFont, title, white, rect.center))
 
         # Draw buttons
         playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
-        playX = mediumFont.render("Play as X", True, black)
-        playXRect = playX.get_rect()
-        playXRect.center = playXButton.center
-        pygame.draw.rect(screen, white, playXButton)
-        screen.blit(playX, playXRect)
+        paint(playXButton, "Play as X", draw_button("Play as X"))
 
         playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
-        playO = mediumFont.render("Play as O", True, black)
-        playORect = playO.get_rect()
-        playORect.center = playOButton.center
-        pygame.draw.rect(screen, white, playOButton)
-        screen.blit(playO, playORect)
+        paint(playOButton, "Play as O", draw_button("Play as O"))
 
         # Check if button is clicked
         click, _, _ = pygame.mouse.get_pressed()
@@ -67,25 +176,18 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (args.size / 2 * tile_size),
+                       height / 2 - (args.size / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(args.size):
             row = []
-            for j in range(3):
+            for j in range(args.size):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
                     tile_size, tile_size
                 )
-                pygame.draw.rect(screen, white, rect, 3)
-
-                if board[i][j] != ttt.EMPTY:
-                    move = moveFont.render(board[i][j], True, white)
-                    moveRect = move.get_rect()
-                    moveRect.center = rect.center
-                    screen.blit(move, moveRect)
+                paint(rect, board[i][j], draw_tile(board[i][j]))
                 row.append(rect)
             tiles.append(row)
 
@@ -103,37 +205,30 @@ while True:
             title = f"Play as {user}"
         else:
             title = f"Computer thinking..."
-        title = largeFont.render(title, True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 30)
-        screen.blit(title, titleRect)
+        paint(pygame.Rect(0, 0, width, 60), title,
+              lambda rect: draw_text(largeFont, title, white, rect.center))
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = executor.submit(ttt.minimax, board)
+                ai_started = time.time()
+            elif ai_move.done() and time.time() - ai_started >= ai_delay:
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(args.size):
+                for j in range(args.size):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
         if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
+            paint(againButton, "Play Again", draw_button("Play Again"))
             click, _, _ = pygame.mouse.get_pressed()
             if click == 1:
                 mouse = pygame.mouse.get_pos()
@@ -141,6 +236,17 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
-
-    pygame.display.flip()
+                    ai_move = None
+        else:
+            paint(againButton, None, lambda rect: None)
+
+    # Send only the regions that changed to the display, and sleep
+    # off the rest of the frame
+    if dirty:
+        pygame.display.update(dirty)
+        dirty.clear()
+    clock.tick(fps)
+
+    frames += 1
+    if args.frames is not None and frames >= args.frames:
+        shutdown()
@@ -0,0 +1,196 @@
+"""
+Headless self-play benchmark for the Tic Tac Toe engines.
+
+Plays an engine against itself or against a random player for a number
+of games, alternating who plays X, and prints a JSON report of the
+results, games per second, nodes searched per engine move and the
+per-move latency percentiles, for tracking regressions across engines.
+
+Usage: python selfplay.py [--engine NAME] [--opponent random|self]
+                          [--games N] [--size N -k K --budget S]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+import bitboard
+import mnk
+import tictactoe
+
+# Engines for the 3x3 game, by name. "book" plays through
+# tictactoe.minimax, so uses the opening book when it has been built.
+ENGINES = {
+    "book": lambda: tictactoe,
+    "alphabeta": lambda: bitboard.AlphaBeta({}),
+    "alphabeta-nomemo": lambda: bitboard.AlphaBeta(),
+    "alphabeta-unordered": lambda: bitboard.AlphaBeta(ordering=False,
+                                                      killers=False)
+}
+
+
+class RandomPlayer():
+    """
+    Plays a uniformly random legal move.
+    """
+
+    def __init__(self, game, seed=0):
+        self.game = game
+        self.rng = random.Random(seed)
+        self.stats = None
+
+    def move(self, board):
+        return self.rng.choice(sorted(self.game.actions(board)))
+
+
+class EnginePlayer():
+    """
+    Plays the move an engine chooses: a game object's minimax, or an
+    AlphaBeta search over the 3x3 bitboards. stats is the SearchStats
+    whose node count the engine advances, if it has one.
+    """
+
+    def __init__(self, game, engine):
+        self.game = game
+        self.engine = engine
+        if isinstance(engine, bitboard.AlphaBeta):
+            self.stats = engine.stats
+        elif engine is tictactoe:
+            self.stats = bitboard.engine.stats
+        else:
+            self.stats = engine.stats
+
+    def move(self, board):
+        if isinstance(self.engine, bitboard.AlphaBeta):
+            cell = self.engine.best_move(*tictactoe.encode(board))[1]
+            return divmod(cell, 3)
+        return self.engine.minimax(board)
+
+
+def percentiles(times):
+    """Returns the 50th, 90th and 99th percentiles of times."""
+    if len(times) < 2:
+        return times * 3
+    cuts = statistics.quantiles(times, n=100, method="inclusive")
+    return cuts[49], cuts[89], cuts[98]
+
+
+def play(game, players):
+    """
+    Plays one game between players (X first), returning the winner's
+    index in players or None for a draw, and for every engine move
+    its latency and the nodes it searched.
+    """
+    board = game.initial_state()
+    moves = []
+    turn = 0
+    while not game.terminal(board):
+        current = players[turn]
+        nodes = current.stats.nodes if current.stats else 0
+        start = time.perf_counter()
+        action = current.move(board)
+        latency = time.perf_counter() - start
+        if isinstance(current, EnginePlayer):
+            moves.append((latency, current.stats.nodes - nodes))
+        board = game.result(board, action)
+        turn = 1 - turn
+
+    winner = game.winner(board)
+    if winner is None:
+        return None, moves
+    return (0 if winner == game.X else 1), moves
+
+
+def selfplay(game, engine, opponent, games, seed=0):
+    """
+    Plays games between engine and opponent ("random" or "self"),
+    alternating colours, and returns a JSON-serializable report.
+    """
+    first = EnginePlayer(game, engine)
+    if opponent == "random":
+        second = RandomPlayer(game, seed)
+    else:
+        second = first
+
+    # Wins by colour, and against a random player by who won
+    results = {"X": 0, "O": 0, "draw": 0}
+    if second is not first:
+        results.update(engine=0, opponent=0)
+    moves = []
+    start = time.perf_counter()
+    for i in range(games):
+        players = (first, second) if i % 2 == 0 else (second, first)
+        winner, game_moves = play(game, players)
+        moves.extend(game_moves)
+        if winner is None:
+            results["draw"] += 1
+            continue
+        results["X" if winner == 0 else "O"] += 1
+        if second is not first:
+            results["engine" if players[winner] is first else "opponent"] += 1
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in moves]
+    p50, p90, p99 = percentiles(latencies) if moves else (0, 0, 0)
+    return {
+        "games": games,
+        "results": results,
+        "seconds": round(elapsed, 3),
+        "games_per_sec": round(games / elapsed, 1) if elapsed else None,
+        "engine_moves": len(moves),
+        "nodes_per_move": (round(statistics.mean(
+            nodes for _, nodes in moves
+        ), 1) if moves else 0),
+        "latency_ms": {
+            "p50": round(1000 * p50, 3),
+            "p90": round(1000 * p90, 3),
+            "p99": round(1000 * p99, 3),
+            "max": round(1000 * max(latencies, default=0), 3)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python selfplay.py [--engine NAME] [--opponent random|self] "
+              "[--games N] [--size N -k K --budget S]"
+    )
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="book",
+                        help="engine for the 3x3 game")
+    parser.add_argument("--opponent", choices=["random", "self"],
+                        default="random")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=3,
+                        help="rows and columns on the board")
+    parser.add_argument("-k", type=int, default=3,
+                        help="marks in a row needed to win")
+    parser.add_argument("--budget", type=float, default=0.1,
+                        help="seconds per move on boards bigger than 3x3")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.size == 3 and args.k == 3:
+        game = tictactoe
+        engine = ENGINES[args.engine]()
+        name = args.engine
+    else:
+        game = engine = mnk.Game(args.size, args.size, args.k, args.budget)
+        name = "mnk"
+
+    report = {
+        "engine": name,
+        "opponent": args.opponent,
+        "size": args.size,
+        "k": args.k
+    }
+    report.update(selfplay(game, engine, args.opponent, args.games,
+                           args.seed))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 Tic Tac Toe Player
 """
 
-import math
-import copy
+import bitboard
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
@@ -23,147 +24,91 @@ def initial_state():
 board11 = [[EMPTY,O,EMPTY],
             [X,O,X],
             [EMPTY,EMPTY,X]]
+
+
+def encode(board):
+    """
+    Returns the bitboard (x, o) of a board.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    cnt = 0
-    for i in range(3):
-        for j in range(3):
-            if(board[i][j] is not None):
-                cnt = cnt+1
-    if(cnt%2 == 0):
-        return X
-    else:
-        return O
-    #raise NotImplementedError
+    return X if bitboard.x_to_move(*encode(board)) else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    l = set()
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] is None:
-                l.add((i,j))
-
-    return l
-    #raise NotImplementedError
+    return {divmod(cell, 3) for cell in bitboard.moves(*encode(board))}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    board1 = copy.deepcopy(board)
-    i,j = action
-    if i<0 or j<0 or i>3 or j>3:
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
         raise IndexError
-    playr = player(board1)
-    board1[i][j] = playr
+    board1 = [list(row) for row in board]
+    board1[i][j] = player(board)
     return board1
-    #raise NotImplementedError
 
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    if not terminal(board):
-        return None
     state = utility(board)
-    if state == 0:
-        return None
-    elif state == 1:
+    if state == 1:
         return X
-    else:
+    elif state == -1:
         return O
-    #raise NotImplementedError
+    return None
 
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    state = False
-    ut = utility(board)
-    if ut == 1 or ut == -1:
-        return True
-
-    for i in range(3):
-        for j in range(3):
-            if(board[i][j] is None):
-                state = True
-    return not(state)
-    #raise NotImplementedError
+    return bitboard.terminal(*encode(board))
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    state = 0
-    for i in range(3):
-        if(board[i][0] is not None) & (board[i][1] is not None) & (board[i][2] is not None):
-            if(board[i][0] == board[i][1]) & (board[i][1] == board[i][2]):
-                if(board[i][0] == X):
-                    state = 1
-                else:
-                    state = -1
-
-    for i in range(3):
-        if(board[0][i] is not None) & (board[1][i] is not None) & (board[2][i] is not None):
-            if(board[0][i] == board[1][i]) & (board[1][i] == board[2][i]):
-                if(board[1][i] == X):
-                    state = 1
-                else:
-                    state = -1
-
-    if(board[0][0] is not None) & (board[1][1] is not None) & (board[2][2] is not None):
-        if(board[0][0] == board[1][1]) & (board[1][1] == board[2][2]):
-            if(board[0][0] == X):
-                state = 1
-            else:
-                state = -1
-    if(board[0][2] is not None) & (board[1][1] is not None) & (board[2][0] is not None):
-        if(board[0][2]==board[1][1]) & (board[1][1]==board[2][0]):
-            if board[0][2] == X:
-                state = 1
-            else:
-                state = -1
-    return state
-    #raise NotImplementedError
+    return bitboard.utility(*encode(board))
 
 
 def minimax(board):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the optimal action for the current player on the board,
+    from the opening book when there is one and searching otherwise.
     """
     if terminal(board):
         return None
+    cell = book.lookup(*encode(board))
+    if cell is not None:
+        return divmod(cell, 3)
     return myminimax(board)[1]
 
+
 def myminimax(board):
-    if terminal(board):
-        return (utility(board), None)
-    acts = actions(board)
-    playr = player(board)
-    if playr == X:
-        playr = 1
-    else:
-        playr = -1
-    l=[None,None]
-    for act in acts:
-        res = myminimax(result(board,act))
-        if res[0] == playr:
-            return (playr,act)
-        elif res[0] == 0:
-            l[0] = (0,act)
-        else:
-            l[1] = (res[0],act)
-    if l[0] is not None:
-        return l[0]
-    else:
-        return l[1]
\ No newline at end of file
+    """
+    Returns (value, action): the value of the board under optimal play
+    and an optimal action, or (utility, None) if the game is over.
+    """
+    value, cell = bitboard.best_move(*encode(board))
+    return value, None if cell is None else divmod(cell, 3)
@@ -0,0 +1,103 @@
+"""
+Benchmarks model_check on the puzzle.py knowledge bases.
+
+Times the question puzzle.py asks, whether each knowledge base entails
+each symbol, with the original model_check, which walks the sentence
+objects for every model, and with the current one, which compiles
+them to evaluate bitwise over many models at once. Extra symbols,
+constrained only by tautologies, can be added to every knowledge base
+to see how the two scale with the number of models.
+
+Usage: python benchmark.py [--extra N] [--repeat N]
+"""
+
+import argparse
+import time
+
+import puzzle
+from logic import Symbol, Not, And, Or, compiled, model_check
+
+SYMBOLS = [puzzle.AKnight, puzzle.AKnave,
+           puzzle.BKnight, puzzle.BKnave,
+           puzzle.CKnight, puzzle.CKnave]
+
+PUZZLES = [("Puzzle 0", puzzle.knowledge0),
+           ("Puzzle 1", puzzle.knowledge1),
+           ("Puzzle 2", puzzle.knowledge2),
+           ("Puzzle 3", puzzle.knowledge3)]
+
+
+def walk_check(knowledge, query):
+    """
+    Checks if knowledge base entails query the way model_check
+    originally did, evaluating the sentences in every model.
+    """
+
+    def check_all(knowledge, query, symbols, model):
+        if not symbols:
+            if knowledge.evaluate(model):
+                return query.evaluate(model)
+            return True
+        remaining = symbols.copy()
+        p = remaining.pop()
+        model_true = model.copy()
+        model_true[p] = True
+        model_false = model.copy()
+        model_false[p] = False
+        return (check_all(knowledge, query, remaining, model_true) and
+                check_all(knowledge, query, remaining, model_false))
+
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    return check_all(knowledge, query, symbols, dict())
+
+
+def padded(knowledge, extra):
+    """
+    Returns knowledge with extra symbols, each only in a tautology,
+    so it entails the same symbols over 2^extra times as many models.
+    """
+    if not extra:
+        return knowledge
+    padding = [Symbol(f"Extra {i}") for i in range(extra)]
+    return And(knowledge, *[Or(symbol, Not(symbol)) for symbol in padding])
+
+
+def timed(check, knowledge, repeat):
+    """
+    Returns the symbols knowledge entails and the seconds one pass
+    over SYMBOLS took, the best of repeat passes. Each pass starts
+    without compiled sentences, as a run of puzzle.py does.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        compiled.cache_clear()
+        start = time.perf_counter()
+        entailed = [symbol for symbol in SYMBOLS if check(knowledge, symbol)]
+        best = min(best, time.perf_counter() - start)
+    return entailed, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--extra", type=int, default=0,
+                        help="unconstrained symbols to add to every "
+                             "knowledge base")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="passes to take the best time of")
+    args = parser.parse_args()
+
+    print(f"{'':10} {'models':>8} {'walk ms':>9} {'current ms':>11} "
+          f"{'speedup':>8}")
+    for name, knowledge in PUZZLES:
+        knowledge = padded(knowledge, args.extra)
+        models = 2 ** len(knowledge.symbols())
+        expected, walk = timed(walk_check, knowledge, args.repeat)
+        entailed, current = timed(model_check, knowledge, args.repeat)
+        if entailed != expected:
+            raise Exception(f"{name}: model_check disagrees")
+        print(f"{name:10} {models:>8} {1000 * walk:>9.2f} "
+              f"{1000 * current:>11.2f} {walk / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import functools
 import itertools
 
 
@@ -15,6 +16,41 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def bitwise(self, index):
+        """
+        Returns Python source for an expression evaluating the sentence
+        in many models at once. Each model is a bit position: m holds
+        an int for each symbol, with the bits set where it is true, and
+        full has every bit set. The result has the bits set where the
+        sentence is true.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols):
+        """
+        Returns a function of m and full, as described in bitwise(),
+        with one int in m for each symbol name in symbols in that
+        order. It evaluates the sentence in every model at once, as
+        one generated expression instead of walking the sentence's
+        objects.
+        """
+        index = {name: i for i, name in enumerate(symbols)}
+        source = f"lambda m, full: {self.bitwise(index)}"
+        return eval(compile(source, "<sentence>", "eval"))
+
+    @classmethod
+    def combine(cls, operator, expressions):
+        """
+        Joins expressions with a binary operator, paired up level by
+        level so that the source nests only about log2(n) deep however
+        many there are, within the limits of Python's parser.
+        """
+        while len(expressions) > 1:
+            pairs = [f"({left} {operator} {right})" for left, right
+                     in zip(expressions[::2], expressions[1::2])]
+            expressions = pairs + expressions[len(pairs) * 2:]
+        return expressions[0]
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +104,12 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def bitwise(self, index):
+        try:
+            return f"m[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +134,9 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def bitwise(self, index):
+        return f"(full ^ {self.operand.bitwise(index)})"
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +174,28 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def flattened(self):
+        """
+        Returns the conjuncts, with those of any nested And in its place.
+        """
+        conjuncts = []
+        stack = self.conjuncts[::-1]
+        while stack:
+            conjunct = stack.pop()
+            if isinstance(conjunct, And):
+                stack.extend(conjunct.conjuncts[::-1])
+            else:
+                conjuncts.append(conjunct)
+        return conjuncts
+
+    def bitwise(self, index):
+        conjuncts = self.flattened()
+        if not conjuncts:
+            return "full"
+        return Sentence.combine(
+            "&", [conjunct.bitwise(index) for conjunct in conjuncts]
+        )
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +227,28 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def flattened(self):
+        """
+        Returns the disjuncts, with those of any nested Or in its place.
+        """
+        disjuncts = []
+        stack = self.disjuncts[::-1]
+        while stack:
+            disjunct = stack.pop()
+            if isinstance(disjunct, Or):
+                stack.extend(disjunct.disjuncts[::-1])
+            else:
+                disjuncts.append(disjunct)
+        return disjuncts
+
+    def bitwise(self, index):
+        disjuncts = self.flattened()
+        if not disjuncts:
+            return "0"
+        return Sentence.combine(
+            "|", [disjunct.bitwise(index) for disjunct in disjuncts]
+        )
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +280,11 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def bitwise(self, index):
+        antecedent = self.antecedent.bitwise(index)
+        consequent = self.consequent.bitwise(index)
+        return f"((full ^ {antecedent}) | {consequent})"
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -224,40 +318,112 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def bitwise(self, index):
+        left = self.left.bitwise(index)
+        right = self.right.bitwise(index)
+        return f"(full ^ {left} ^ {right})"
+
+
+# Above this many symbols, entailment is decided by the SAT solver in
+# sat.py instead of enumerating every model
+SAT_THRESHOLD = 16
+
+# Below this many symbols, there are too few models to repay compiling
+# the sentences, so they are evaluated directly
+COMPILE_THRESHOLD = 6
+
+# Models are evaluated bitwise in chunks of 2^CHUNK_SYMBOLS, which
+# bounds the size of every int to 2^CHUNK_SYMBOLS bits, 8 KiB. As this
+# equals SAT_THRESHOLD, model_check always fits in one chunk; only
+# calling truth_table directly, with more symbols, uses several. Above
+# 16 symbols the SAT solver was faster on every knowledge base tried,
+# from the padded puzzles to random 3-CNF.
+CHUNK_SYMBOLS = 16
+
+
+@functools.lru_cache(maxsize=256)
+def compiled(sentence, symbols):
+    """
+    Returns sentence compiled over symbols, a tuple of names, reusing
+    the function when the same sentence is checked again, or None if
+    it nests too deeply for Python to compile.
+    """
+    try:
+        return sentence.compile(symbols)
+    except (SyntaxError, RecursionError):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def chunk_masks(count):
+    """
+    Returns the masks of count symbols over a chunk of 2^count models,
+    in which bit j of symbol i's mask is bit i of j, and the mask with
+    all 2^count bits set.
+    """
+    full = (1 << (1 << count)) - 1
+    # Dividing by 2^(2^i) + 1 repeats 2^i ones then 2^i zeros
+    masks = tuple(full // ((1 << (1 << i)) + 1) << (1 << i)
+                  for i in range(count))
+    return masks, full
+
+
+def truth_table(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating both over
+    the models bitwise, up to 2^CHUNK_SYMBOLS of them at a time.
+
+    Unlike the SAT solver, it takes the same time on every knowledge
+    base with n symbols, and memory stays bounded up to n = 30 or so.
+    """
+    symbols = tuple(sorted(set.union(knowledge.symbols(), query.symbols())))
+
+    # A chunk covers every model of the first symbols, and fixes the rest
+    low = min(len(symbols), CHUNK_SYMBOLS)
+    high = len(symbols) - low
+    masks, full = chunk_masks(low)
+
+    knowledge_bits = compiled(knowledge, symbols)
+    query_bits = compiled(query, symbols)
+    if knowledge_bits is None or query_bits is None:
+        return check_models(knowledge, query, symbols)
+
+    # The query must be true in every model where the knowledge base is
+    for chunk in range(2 ** high):
+        fixed = tuple(full if chunk >> i & 1 else 0 for i in range(high))
+        models = masks + fixed
+        if knowledge_bits(models, full) & ~query_bits(models, full):
+            return False
+    return True
+
+
+def check_models(knowledge, query, symbols):
+    """
+    Checks if knowledge base entails query by evaluating both in each
+    model over symbols in turn.
+    """
+    models = itertools.product((True, False), repeat=len(symbols))
+    for values in models:
+        model = dict(zip(symbols, values))
+
+        # If knowledge base is true in model, then query must also be true
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
+
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
-
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = tuple(sorted(set.union(knowledge.symbols(), query.symbols())))
+    if len(symbols) > SAT_THRESHOLD:
+        # Imported here, as sat.py imports this module
+        from sat import entails
+        return entails(knowledge, query)
+
+    if len(symbols) < COMPILE_THRESHOLD:
+        return check_models(knowledge, query, symbols)
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Compile both sentences to evaluate bitwise over all 2^n models
+    return truth_table(knowledge, query)
@@ -0,0 +1,346 @@
+"""
+SAT-based entailment for logic.py sentences.
+
+A knowledge base entails a query exactly when the knowledge base and
+the negated query can't both be true. Sentences are compiled to
+conjunctive normal form with the Tseitin encoding, which gives every
+compound subsentence a fresh variable defined by a few short clauses,
+so the CNF grows linearly with the sentence. A CDCL solver (unit
+propagation over two watched literals per clause, first-UIP clause
+learning with non-chronological backjumping, and activity-ordered
+decisions) then searches for a satisfying assignment.
+
+Variables are numbered from 1, and a literal is a variable v or -v.
+"""
+
+import heapq
+
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+
+
+class CNF():
+    """
+    Clauses over numbered variables, compiled from sentences.
+    Structurally equal subsentences share one variable.
+    """
+
+    def __init__(self):
+        # Maps symbol names to their variables
+        self.variables = {}
+        # Maps compound sentences to the literals defined equal to them
+        self.definitions = {}
+        self.clauses = []
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is,
+        adding the clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.new_variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        if isinstance(sentence, And):
+            literals = [self.literal(part) for part in sentence.conjuncts]
+            v = self.new_variable()
+            # v implies every conjunct, and all of them together imply v
+            for literal in literals:
+                self.clauses.append([-v, literal])
+            self.clauses.append([v] + [-literal for literal in literals])
+        elif isinstance(sentence, Or):
+            literals = [self.literal(part) for part in sentence.disjuncts]
+            v = self.new_variable()
+            # v implies some disjunct, and each of them implies v
+            for literal in literals:
+                self.clauses.append([v, -literal])
+            self.clauses.append([-v] + literals)
+        elif isinstance(sentence, Implication):
+            v = self.literal(Or(Not(sentence.antecedent), sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses.extend([
+                [-v, -a, b], [-v, a, -b], [v, a, b], [v, -a, -b]
+            ])
+        else:
+            raise TypeError(f"can't compile {sentence!r}")
+
+        self.definitions[sentence] = v
+        return v
+
+    def add(self, sentence):
+        """
+        Adds clauses requiring sentence to be true. Conjunctions,
+        disjunctions and implications at the top are added directly,
+        without defining a variable for them.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        elif (isinstance(sentence, Not)
+              and isinstance(sentence.operand, (And, Or, Implication))):
+            operand = sentence.operand
+            if isinstance(operand, And):
+                self.add(Or(*[Not(conjunct)
+                              for conjunct in operand.conjuncts]))
+            elif isinstance(operand, Or):
+                for disjunct in operand.disjuncts:
+                    self.add(Not(disjunct))
+            else:
+                self.add(operand.antecedent)
+                self.add(Not(operand.consequent))
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+class Solver():
+    """
+    CDCL SAT solver over clauses of nonzero integer literals
+    on variables 1 to count.
+    """
+
+    def __init__(self, clauses, count):
+        self.count = count
+        # Per variable: 1 if true, -1 if false, 0 if unassigned
+        self.values = [0] * (count + 1)
+        self.levels = [0] * (count + 1)
+        # The clause that forced each variable, or None if decided
+        self.reasons = [None] * (count + 1)
+        # Polarity each variable last had, tried first when deciding
+        self.phases = [-1] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.heap = [(0.0, v) for v in range(1, count + 1)]
+
+        self.trail = []
+        # Position in the trail where each decision level starts
+        self.trail_starts = []
+        # Trail position up to which assignments have been propagated
+        self.head = 0
+
+        # Maps each literal to the clauses watching it
+        self.watches = {}
+        self.clauses = []
+        self.unsatisfiable = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, clause):
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            # Unit clauses are assigned before search, at level 0
+            value = self.value(clause[0])
+            if value < 0:
+                self.unsatisfiable = True
+            elif value == 0:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def assign(self, literal, reason):
+        v = abs(literal)
+        self.values[v] = 1 if literal > 0 else -1
+        self.levels[v] = len(self.trail_starts)
+        self.reasons[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses, returning
+        a clause made false if there is a conflict, else None.
+
+        Each clause watches its first two literals. Only when one of
+        them becomes false does the clause need looking at: it then
+        finds another literal to watch that isn't false, or, failing
+        that, its other watched literal is forced.
+        """
+        trail = self.trail
+        watches = self.watches
+        values = self.values
+        while self.head < len(trail):
+            false = -trail[self.head]
+            self.head += 1
+            watching = watches.get(false, [])
+            kept = []
+            for i, clause in enumerate(watching):
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                value = values[abs(first)]
+                if (value if first > 0 else -value) > 0:
+                    kept.append(clause)
+                    continue
+
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = values[abs(literal)]
+                    if (value if literal > 0 else -value) >= 0:
+                        clause[1], clause[k] = literal, false
+                        watches.setdefault(literal, []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    value = values[abs(first)]
+                    if (value if first > 0 else -value) < 0:
+                        kept.extend(watching[i + 1:])
+                        watches[false] = kept
+                        return clause
+                    self.assign(first, clause)
+            watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (clause, level): the first-UIP clause learned from a
+        conflict, its asserting literal first, and the level to jump
+        back to, where that literal becomes forced.
+        """
+        level = len(self.trail_starts)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        literal = None
+        while True:
+            for q in clause if literal is None else clause[1:]:
+                v = abs(q)
+                if v in seen or self.levels[v] == 0:
+                    continue
+                seen.add(v)
+                self.bump(v)
+                if self.levels[v] == level:
+                    pending += 1
+                else:
+                    learned.append(q)
+
+            # Step back to the latest assignment involved
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if not pending:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal from the highest remaining level second, so
+        # that it is the last to become unassigned when backjumping
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        heapq.heappush(self.heap, (-self.activity[v], v))
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[v], v)
+                         for v in range(1, self.count + 1)]
+            heapq.heapify(self.heap)
+
+    def backjump(self, level):
+        """Undoes every assignment made above level."""
+        start = self.trail_starts[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.phases[v] = self.values[v]
+            self.values[v] = 0
+            self.reasons[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_starts[level:]
+        self.head = start
+
+    def decide(self):
+        """
+        Returns the most active unassigned variable, with the polarity
+        it last had, or None if every variable is assigned.
+        """
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if not self.values[v]:
+                return v * self.phases[v]
+        return None
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a list of values indexed by
+        variable (True or False; index 0 unused), or None if the
+        clauses are unsatisfiable.
+        """
+        if self.unsatisfiable:
+            return None
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.trail_starts:
+                    return None
+                learned, level = self.analyze(conflict)
+                self.backjump(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= 0.95
+            else:
+                literal = self.decide()
+                if literal is None:
+                    return [value > 0 for value in self.values]
+                self.trail_starts.append(len(self.trail))
+                self.assign(literal, None)
+
+
+def satisfiable(sentence):
+    """Returns True if some model makes sentence true."""
+    cnf = CNF()
+    cnf.add(sentence)
+    return Solver(cnf.clauses, cnf.count).solve() is not None
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return Solver(cnf.clauses, cnf.count).solve() is None
@@ -1,3 +1,4 @@
+import argparse
 import pygame
 import sys
 import time
@@ -13,10 +14,20 @@ BLACK = (0, 0, 0)
 GRAY = (180, 180, 180)
 WHITE = (255, 255, 255)
 
+# Frames drawn per second at most
+FPS = 30
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--frames", type=int, default=None,
+                    help="quit after this many frames, e.g. to run "
+                         "headless with SDL_VIDEODRIVER=dummy")
+args = parser.parse_args()
+
 # Create game
 pygame.init()
 size = width, height = 600, 400
 screen = pygame.display.set_mode(size)
+clock = pygame.time.Clock()
 
 # Fonts
 OPEN_SANS = "assets/fonts/OpenSans-Regular.ttf"
@@ -37,6 +48,87 @@ flag = pygame.transform.scale(flag, (cell_size, cell_size))
 mine = pygame.image.load("assets/images/mine.png")
 mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
+# Rendered text, by font, text and color
+glyphs = {}
+
+
+def render(font, text, color):
+    key = (font, text, color)
+    if key not in glyphs:
+        glyphs[key] = font.render(text, True, color)
+    return glyphs[key]
+
+
+# Cell surfaces, by what the cell shows: None when covered or empty,
+# "mine", "flag", or the number of nearby mines
+tiles = {}
+
+
+def tile(content):
+    if content not in tiles:
+        surface = pygame.Surface((cell_size, cell_size))
+        surface.fill(GRAY)
+        pygame.draw.rect(surface, WHITE, surface.get_rect(), 3)
+        if content == "mine":
+            surface.blit(mine, (0, 0))
+        elif content == "flag":
+            surface.blit(flag, (0, 0))
+        elif content is not None:
+            number = render(smallFont, str(content), BLACK)
+            surface.blit(number, number.get_rect(
+                center=surface.get_rect().center
+            ))
+        tiles[content] = surface
+    return tiles[content]
+
+
+# What is drawn in each region of the screen, by its rectangle, and
+# the regions redrawn this frame. Only those are sent to the display.
+drawn = {}
+dirty = []
+
+
+def paint(rect, content, draw):
+    """
+    Redraws the region rect by calling draw(rect),
+    unless it already shows content.
+    """
+    key = tuple(rect)
+    if key in drawn and drawn[key] == content:
+        return
+    drawn[key] = content
+    screen.fill(BLACK, rect)
+    draw(rect)
+    dirty.append(rect)
+
+
+def draw_text(font, text, color, center):
+    surface = render(font, text, color)
+    screen.blit(surface, surface.get_rect(center=center))
+
+
+def draw_button(text):
+    def draw(rect):
+        pygame.draw.rect(screen, WHITE, rect)
+        draw_text(mediumFont, text, BLACK, rect.center)
+    return draw
+
+
+def end_frame():
+    """
+    Sends only the regions that changed to the display, then sleeps
+    off the rest of the frame.
+    """
+    global frames
+    if dirty:
+        pygame.display.update(dirty)
+        dirty.clear()
+    clock.tick(FPS)
+    frames += 1
+    if args.frames is not None and frames >= args.frames:
+        sys.exit()
+
+
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
 ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
@@ -48,6 +140,8 @@ lost = False
 
 # Show instructions initially
 instructions = True
+scene = None
+frames = 0
 
 while True:
 
@@ -56,16 +150,20 @@ while True:
         if event.type == pygame.QUIT:
             sys.exit()
 
-    screen.fill(BLACK)
+    # Start from a blank screen whenever switching between screens
+    if scene != instructions:
+        scene = instructions
+        drawn.clear()
+        screen.fill(BLACK)
+        dirty.append(screen.get_rect())
 
     # Show game instructions
     if instructions:
 
         # Title
-        title = largeFont.render("Play Minesweeper", True, WHITE)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
+        paint(pygame.Rect(0, 20, width, 60), "Play Minesweeper",
+              lambda rect: draw_text(largeFont, "Play Minesweeper", WHITE,
+                                     rect.center))
 
         # Rules
         rules = [
@@ -74,18 +172,12 @@ while True:
             "Mark all mines successfully to win!"
         ]
         for i, rule in enumerate(rules):
-            line = smallFont.render(rule, True, WHITE)
-            lineRect = line.get_rect()
-            lineRect.center = ((width / 2), 150 + 30 * i)
-            screen.blit(line, lineRect)
+            paint(pygame.Rect(0, 135 + 30 * i, width, 30), rule,
+                  lambda rect: draw_text(smallFont, rule, WHITE, rect.center))
 
         # Play game button
         buttonRect = pygame.Rect((width / 4), (3 / 4) * height, width / 2, 50)
-        buttonText = mediumFont.render("Play Game", True, BLACK)
-        buttonTextRect = buttonText.get_rect()
-        buttonTextRect.center = buttonRect.center
-        pygame.draw.rect(screen, WHITE, buttonRect)
-        screen.blit(buttonText, buttonTextRect)
+        paint(buttonRect, "Play Game", draw_button("Play Game"))
 
         # Check if play button clicked
         click, _, _ = pygame.mouse.get_pressed()
@@ -95,7 +187,7 @@ while True:
                 instructions = False
                 time.sleep(0.3)
 
-        pygame.display.flip()
+        end_frame()
         continue
 
     # Draw board
@@ -104,28 +196,22 @@ while True:
         row = []
         for j in range(WIDTH):
 
-            # Draw rectangle for cell
+            # Draw the cell, with a mine, flag, or number if needed
             rect = pygame.Rect(
                 board_origin[0] + j * cell_size,
                 board_origin[1] + i * cell_size,
                 cell_size, cell_size
             )
-            pygame.draw.rect(screen, GRAY, rect)
-            pygame.draw.rect(screen, WHITE, rect, 3)
-
-            # Add a mine, flag, or number if needed
             if game.is_mine((i, j)) and lost:
-                screen.blit(mine, rect)
+                content = "mine"
             elif (i, j) in flags:
-                screen.blit(flag, rect)
+                content = "flag"
             elif (i, j) in revealed:
-                neighbors = smallFont.render(
-                    str(game.nearby_mines((i, j))),
-                    True, BLACK
-                )
-                neighborsTextRect = neighbors.get_rect()
-                neighborsTextRect.center = rect.center
-                screen.blit(neighbors, neighborsTextRect)
+                content = game.nearby_mines((i, j))
+            else:
+                content = None
+            paint(rect, content,
+                  lambda rect: screen.blit(tile(content), rect))
 
             row.append(rect)
         cells.append(row)
@@ -135,29 +221,21 @@ while True:
         (2 / 3) * width + BOARD_PADDING, (1 / 3) * height - 50,
         (width / 3) - BOARD_PADDING * 2, 50
     )
-    buttonText = mediumFont.render("AI Move", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = aiButton.center
-    pygame.draw.rect(screen, WHITE, aiButton)
-    screen.blit(buttonText, buttonRect)
+    paint(aiButton, "AI Move", draw_button("AI Move"))
 
     # Reset button
     resetButton = pygame.Rect(
         (2 / 3) * width + BOARD_PADDING, (1 / 3) * height + 20,
         (width / 3) - BOARD_PADDING * 2, 50
     )
-    buttonText = mediumFont.render("Reset", True, BLACK)
-    buttonRect = buttonText.get_rect()
-    buttonRect.center = resetButton.center
-    pygame.draw.rect(screen, WHITE, resetButton)
-    screen.blit(buttonText, buttonRect)
+    paint(resetButton, "Reset", draw_button("Reset"))
 
     # Display text
     text = "Lost" if lost else "Won" if game.mines == flags else ""
-    text = mediumFont.render(text, True, WHITE)
-    textRect = text.get_rect()
+    textRect = pygame.Rect(0, 0, (width / 3) - BOARD_PADDING * 2, 50)
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
-    screen.blit(text, textRect)
+    paint(textRect, text,
+          lambda rect: draw_text(mediumFont, text, WHITE, rect.center))
 
     move = None
 
@@ -199,6 +277,7 @@ while True:
             revealed = set()
             flags = set()
             lost = False
+            end_frame()
             continue
 
         # User-made move
@@ -219,4 +298,4 @@ while True:
             revealed.add(move)
             ai.add_knowledge(move, nearby)
 
-    pygame.display.flip()
+    end_frame()